@@ -2,6 +2,8 @@ from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.auth.schemas import UserCreate
+from app.crud import get_user_by_username
+from app.sharding import shard_router
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -15,13 +17,18 @@ def create_user(db: Session, user_data: UserCreate):
     )
 
     db.add(db_user)
+    db.flush()
+
+    # Place the user's data on a shard once the ID is known
+    db_user.shard = shard_router.shard_for(db_user.id)     # type: ignore
+
     db.commit()
     db.refresh(db_user)
 
     return db_user
 
 def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+    user = get_user_by_username(db, username=username)
 
     if not user or not pwd_context.verify(password, str(user.hashed_password)):
         return False
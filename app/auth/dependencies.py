@@ -3,6 +3,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.sharding import shard_router
 from app import crud
 from app.models.user import User
 from jose import JWTError, jwt
@@ -71,4 +72,13 @@ def get_current_user(
         
         return user
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+# Dependency to get a session on the current user's shard
+def get_user_db(current_user: User = Depends(get_current_user)):
+    db = shard_router.session_for(current_user)
+
+    try:
+        yield db
+    finally:
+        db.close()
\ No newline at end of file
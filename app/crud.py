@@ -1,12 +1,164 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.schemas import MovementCreate, MovementUpdate
-from app.models import Movement
+from sqlalchemy import select, update, delete, lambda_stmt, bindparam, func, case, cast, extract, Float, Integer, String
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.schemas import MovementCreate, MovementUpdate, BudgetCreate, RecurringMovementCreate
+from app.schemas.movement import MovementType
+from app.models import Movement, Budget, BudgetAlert, RecurringMovement, IdempotencyKey, UserDataVersion
 from app.models.user import User
-from typing import Optional, Dict
-from datetime import datetime, timezone, date
+from app.recurring import iter_occurrences, next_occurrence
+from typing import Optional, Dict, List, Iterator
+from datetime import datetime, timezone, date, time
+from decimal import Decimal
 
-def create_movement(db: Session, movement: MovementCreate, user_id: int):
+# Budget thresholds (percent of the limit) that raise an alert
+BUDGET_ALERT_LEVELS = (100, 80)
+
+# Prebuilt statements for fixed-shape queries. They are built once and
+# their cache key is memoized, so each call only binds parameters and
+# reuses the compiled SQL. Queries with optional filters use lambda_stmt.
+_MOVEMENT_BY_ID = select(Movement).where(Movement.id == bindparam("movement_id"))
+
+_USER_MOVEMENT_BY_ID = select(Movement).where(
+    Movement.id == bindparam("movement_id"),
+    Movement.user_id == bindparam("user_id")
+)
+
+# Days since 1970-01-01 of a movement date, per dialect
+_EPOCH_DAY = {
+    "sqlite": cast(func.julianday(Movement.date) - 2440587.5, Integer),
+    "postgresql": cast(func.floor(extract("epoch", Movement.date) / 86400), Integer)
+}
+
+# Recent history as a single string: one "id,amount,is_expense,epoch_day"
+# group per movement, joined with commas. Each row's fields stay together,
+# so the (unspecified) aggregation order cannot mix up movements. The
+# database builds the string and NumPy parses it, so no Python object is
+# created per movement. SQLite concatenates numbers as they are; PostgreSQL
+# needs text.
+_MOVEMENT_HISTORY = {
+    name: select(
+        func.aggregate_strings(
+            to_text(Movement.id)
+            .concat(",").concat(to_text(cast(Movement.amount, Float)))
+            .concat(",").concat(to_text(cast(Movement.type == "expense", Integer)))
+            .concat(",").concat(to_text(_EPOCH_DAY[name])),
+            ","
+        )
+    ).where(
+        Movement.user_id == bindparam("user_id"),
+        Movement.date >= bindparam("since")
+    )
+    for name, to_text in (
+        ("sqlite", lambda column: column),
+        ("postgresql", lambda column: cast(column, String))
+    )
+}
+
+_MOVEMENT_DATES = select(Movement.id, Movement.date).where(
+    Movement.id.in_(bindparam("movement_ids", expanding=True))
+)
+
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
+_DATA_VERSION = select(UserDataVersion.version).where(
+    UserDataVersion.user_id == bindparam("user_id")
+)
+
+# INSERT supporting ON CONFLICT, per dialect. The statement dicts below are
+# keyed the same way; app.database.check_dialect rejects any other database
+# at startup.
+_DIALECT_INSERT = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+# Upsert per dialect: INSERT ... ON CONFLICT (user_id) DO UPDATE version + 1
+_BUMP_DATA_VERSION = {
+    name: dialect_insert(UserDataVersion).values(
+        user_id=bindparam("owner_id"),
+        version=1
+    ).on_conflict_do_update(
+        index_elements=[UserDataVersion.user_id],
+        set_={"version": UserDataVersion.version + 1}
+    )
+    for name, dialect_insert in _DIALECT_INSERT.items()
+}
+
+_USER_BUDGET_BY_ID = select(Budget).where(
+    Budget.id == bindparam("budget_id"),
+    Budget.user_id == bindparam("user_id")
+)
+
+# Adds to the counters in SQL (spent = spent + delta), so concurrent writes
+# never overwrite each other; RETURNING gives the fresh totals. Budgets
+# (stored without a type) track spending, so they only take expenses.
+_ADD_TO_BUDGETS = update(Budget).where(
+    Budget.user_id == bindparam("owner_id"),
+    Budget.period == bindparam("budget_period"),
+    func.coalesce(Budget.movement_type, MovementType.EXPENSE.value) == bindparam("budget_type")
+).values(
+    spent=Budget.spent + bindparam("delta")
+).returning(
+    Budget.id, Budget.spent, Budget.limit_amount, Budget.alert_level
+).execution_options(synchronize_session=False)
+
+# Seeds a new budget from the expenses already in its month. It runs after
+# the budget's INSERT, inside the same write transaction, so a movement
+# committed concurrently is either in the SUM or sees the budget.
+_SEED_BUDGET = update(Budget).where(
+    Budget.id == bindparam("budget_id")
+).values(
+    spent=select(
+        func.coalesce(func.sum(Movement.amount), 0)
+    ).where(
+        Movement.user_id == bindparam("owner_id"),
+        Movement.date >= bindparam("period_start"),
+        Movement.date < bindparam("period_end"),
+        Movement.type == MovementType.EXPENSE.value
+    ).scalar_subquery()
+).returning(
+    Budget.spent
+).execution_options(synchronize_session=False)
+
+_SET_BUDGET_ALERT_LEVEL = update(Budget).where(
+    Budget.id == bindparam("budget_id")
+).values(
+    alert_level=bindparam("level")
+).execution_options(synchronize_session=False)
+
+_ACTIVE_TEMPLATES = select(RecurringMovement).where(
+    RecurringMovement.user_id == bindparam("user_id"),
+    RecurringMovement.is_active.is_(True)
+).order_by(RecurringMovement.id)
+
+_ACTIVE_TEMPLATE_BY_ID = select(RecurringMovement).where(
+    RecurringMovement.id == bindparam("recurring_id"),
+    RecurringMovement.user_id == bindparam("user_id"),
+    RecurringMovement.is_active.is_(True)
+)
+
+_DUE_TEMPLATES_FOR_USER = select(RecurringMovement).where(
+    RecurringMovement.user_id == bindparam("user_id"),
+    RecurringMovement.is_active.is_(True),
+    RecurringMovement.next_occurrence <= bindparam("until")
+)
+
+_IDEMPOTENCY_KEY = select(IdempotencyKey).where(
+    IdempotencyKey.user_id == bindparam("user_id"),
+    IdempotencyKey.key == bindparam("key")
+)
+
+# An expired key not purged yet; "fetch" drops the deleted row from the
+# session's identity map
+_DELETE_STALE_IDEMPOTENCY_KEY = delete(IdempotencyKey).where(
+    IdempotencyKey.user_id == bindparam("user_id"),
+    IdempotencyKey.key == bindparam("key"),
+    IdempotencyKey.created_at < bindparam("cutoff")
+).execution_options(synchronize_session="fetch")
+
+_DELETE_EXPIRED_IDEMPOTENCY_KEYS = delete(IdempotencyKey).where(
+    IdempotencyKey.created_at < bindparam("cutoff")
+).execution_options(synchronize_session=False)
+
+def create_movement(db: Session, movement: MovementCreate, user_id: int, commit: bool=True):
     """
     Creates a new movement in the database.
     
@@ -14,6 +166,8 @@ def create_movement(db: Session, movement: MovementCreate, user_id: int):
         db: Database session
         movement: Movement data validated by MovementCreate
         user_id: ID of the user who owns the movement
+        commit: Commit right away; when False the movement is only flushed
+            and the caller commits it with its own changes
     
     Returns:
         The created movement (SQLAlchemy model)
@@ -28,7 +182,22 @@ def create_movement(db: Session, movement: MovementCreate, user_id: int):
     )
 
     db.add(db_movement)
-    db.commit()
+
+    # Keep budget counters in step with the new movement
+    _apply_budget_delta(
+        db,
+        user_id=user_id,
+        moment=db_movement.date,    # type: ignore
+        movement_type=movement.type,
+        delta=_to_decimal(movement.amount)
+    )
+    _bump_data_version(db, user_id)
+
+    if commit:
+        db.commit()
+    else:
+        db.flush()      # Assigns the ID
+
     db.refresh(db_movement)
 
     return db_movement
@@ -45,7 +214,7 @@ def get_movement(db: Session, movement_id: int):
         The movement if it exists, None if not found
     """
 
-    return db.query(Movement).filter(Movement.id == movement_id).first()
+    return db.scalars(_MOVEMENT_BY_ID, {"movement_id": movement_id}).first()
 
 def get_movements(
     db: Session,
@@ -72,19 +241,65 @@ def get_movements(
         List of movements matching the filters
     """
 
-    # Create base query filtering by user 
-    query = db.query(Movement).filter(Movement.user_id == user_id)
+    statement = _movements_statement(user_id, start_date, end_date, movement_type)
+    
+    # Apply pagination and return results
+    statement += lambda s: s.offset(skip).limit(limit)
+
+    return db.scalars(statement).all()
+
+def iter_movements(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date]=None,
+    end_date: Optional[date]=None,
+    movement_type: Optional[str]=None,
+    skip: int=0,
+    limit: int=100,
+    batch_size: int=500
+) -> Iterator[Movement]:
+    """
+    Same as get_movements, but yields the movements as they are read
+    from the cursor instead of loading the whole page into a list.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user who owns the movements
+        start_date: Start date for filtering (optional)
+        end_date: End date for filtering (optional)
+        movement_type: Type of movement ('income'/'expense') (optional)
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        batch_size: Number of rows fetched from the cursor at a time
+    
+    Returns:
+        Iterator over the movements matching the filters
+    """
+
+    statement = _movements_statement(user_id, start_date, end_date, movement_type)
+    statement += lambda s: s.offset(skip).limit(limit)
+
+    return iter(db.scalars(statement, execution_options={"yield_per": batch_size}))
+
+def _movements_statement(
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    movement_type: Optional[str]
+):
+    # Create base statement filtering by user 
+    statement = lambda_stmt(lambda: select(Movement).where(Movement.user_id == user_id))
 
     # Apply additional filters if provided
     if start_date:
-        query = query.filter(Movement.date >= start_date)
+        statement += lambda s: s.where(Movement.date >= start_date)
     if end_date:
-        query = query.filter(Movement.date <= end_date)
+        statement += lambda s: s.where(Movement.date <= end_date)
     if movement_type:
-        query = query.filter(Movement.type == movement_type.lower())
-    
-    # Apply pagination and return results
-    return query.offset(skip).limit(limit).all()
+        movement_type = movement_type.lower()
+        statement += lambda s: s.where(Movement.type == movement_type)
+
+    return statement
 
 def update_movement(
     db: Session,
@@ -104,16 +319,39 @@ def update_movement(
         The updated movement if it exists, None if not found
     """
 
-    db_movement = db.query(Movement).filter(
-        Movement.id == movement_id,
-        Movement.user_id == user_id
+    db_movement = db.scalars(
+        _USER_MOVEMENT_BY_ID,
+        {"movement_id": movement_id, "user_id": user_id}
     ).first()
 
     if db_movement:
         update_data = movement.model_dump(exclude_unset=True)
 
+        # Snapshot the fields budgets depend on before applying changes
+        previous = (db_movement.amount, db_movement.type, db_movement.date)
+
         for key, value in update_data.items():
             setattr(db_movement, key, value)
+
+        current = (db_movement.amount, db_movement.type, db_movement.date)
+
+        if current != previous:
+            _apply_budget_delta(
+                db,
+                user_id=user_id,
+                moment=previous[2],     # type: ignore
+                movement_type=previous[1],  # type: ignore
+                delta=-_to_decimal(previous[0])
+            )
+            _apply_budget_delta(
+                db,
+                user_id=user_id,
+                moment=current[2],      # type: ignore
+                movement_type=current[1],   # type: ignore
+                delta=_to_decimal(current[0])
+            )
+
+        _bump_data_version(db, user_id)
         
         db.commit()
         db.refresh(db_movement)
@@ -135,6 +373,15 @@ def delete_movement(db: Session, movement_id: int):
     db_movement = get_movement(db, movement_id)
 
     if db_movement:
+        _apply_budget_delta(
+            db,
+            user_id=db_movement.user_id,    # type: ignore
+            moment=db_movement.date,        # type: ignore
+            movement_type=db_movement.type, # type: ignore
+            delta=-_to_decimal(db_movement.amount)
+        )
+        _bump_data_version(db, db_movement.user_id)    # type: ignore
+
         db.delete(db_movement)
         db.commit()
         return True
@@ -146,6 +393,7 @@ def get_balance_summary(
     user_id: int,
     start_date: Optional[date]=None,
     end_date: Optional[date]=None,
+    include_projected: bool=False
 ) -> Dict[str, float]:
     """
     Calculates the financial summary for a user:
@@ -158,32 +406,34 @@ def get_balance_summary(
         user_id: ID of the user
         start_date: Optional start date for filtering
         end_date: Optional end date for filtering
+        include_projected: Also count the recurring occurrences up to
+            end_date that have not been materialized yet
     
     Returns:
         Dictionary with totals and balance
     """
 
-    # Base filter by user 
-    base_query = db.query(Movement).filter(Movement.user_id == user_id)
+    # Both totals in one pass: SUM(CASE WHEN type = ... THEN amount END)
+    statement = lambda_stmt(lambda: select(
+        func.coalesce(func.sum(case((Movement.type == "income", Movement.amount))), 0),
+        func.coalesce(func.sum(case((Movement.type == "expense", Movement.amount))), 0)
+    ).where(Movement.user_id == user_id))
 
     # Apply date filters if present 
     if start_date:
-        base_query = base_query.filter(Movement.date >= start_date)
+        statement += lambda s: s.where(Movement.date >= start_date)
     if end_date:
-        base_query = base_query.filter(Movement.date <= end_date)
+        statement += lambda s: s.where(Movement.date <= end_date)
     
-    # Calculate totals by type 
-    total_income = base_query.filter(
-        Movement.type == "income"
-    ).with_entities(
-        func.coalesce(func.sum(Movement.amount), 0.0)
-    ).scalar() or 0.0
+    income, expense = db.execute(statement).one()
 
-    total_expense = base_query.filter(
-        Movement.type == "expense"
-    ).with_entities(
-        func.coalesce(func.sum(Movement.amount), 0.0)
-    ).scalar() or 0.0
+    total_income = _to_decimal(income)
+    total_expense = _to_decimal(expense)
+
+    if include_projected and end_date:
+        projected = _projected_totals(db, user_id, start_date, end_date)
+        total_income += projected["income"]
+        total_expense += projected["expense"]
 
     return {
         "total_income": round(total_income, 2),
@@ -191,6 +441,294 @@ def get_balance_summary(
         "balance": round(total_income - total_expense, 2)
     }
 
+def get_movement_history(db: Session, user_id: int, since: datetime) -> Optional[str]:
+    """
+    Retrieves the recent movement history of a user as one string,
+    without building a row object per movement.
+
+    Each movement is a group of four comma-separated numbers (id, float
+    amount, 1/0 expense flag and days since 1970-01-01), and the groups
+    are joined with commas too, ready for NumPy to parse.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user
+        since: Oldest movement date to include
+    
+    Returns:
+        The history string (None when there are no movements)
+    """
+
+    statement = _MOVEMENT_HISTORY[db.get_bind().dialect.name]
+
+    return db.scalar(statement, {"user_id": user_id, "since": since})
+
+def get_movement_dates(db: Session, movement_ids: List[int]) -> Dict[int, datetime]:
+    """
+    Retrieves the dates of a few movements.
+    
+    Args:
+        db: Database session
+        movement_ids: IDs of the movements
+    
+    Returns:
+        Dictionary of dates by movement ID
+    """
+
+    if not movement_ids:
+        return {}
+
+    return dict(db.execute(_MOVEMENT_DATES, {"movement_ids": movement_ids}).all())   # type: ignore
+
+def create_recurring_movement(
+    db: Session,
+    recurring: RecurringMovementCreate,
+    user_id: int
+) -> RecurringMovement:
+    """
+    Creates a recurring movement template.
+    
+    Args:
+        db: Database session
+        recurring: Template data validated by RecurringMovementCreate
+        user_id: ID of the user who owns the template
+    
+    Returns:
+        The created template (SQLAlchemy model)
+    """
+
+    db_recurring = RecurringMovement(
+        amount = recurring.amount,
+        type = recurring.type.value,
+        description = recurring.description,
+        frequency = recurring.frequency.value,
+        interval = recurring.interval,
+        start_date = recurring.start_date,
+        end_date = recurring.end_date,
+        occurrence_index = 0,
+        next_occurrence = recurring.start_date,
+        user_id = user_id
+    )
+
+    db.add(db_recurring)
+    db.commit()
+    db.refresh(db_recurring)
+
+    return db_recurring
+
+def get_recurring_movements(db: Session, user_id: int) -> List[RecurringMovement]:
+    """
+    Retrieves the active recurring templates of a user.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user who owns the templates
+    
+    Returns:
+        List of templates
+    """
+
+    return db.scalars(_ACTIVE_TEMPLATES, {"user_id": user_id}).all()   # type: ignore
+
+def deactivate_recurring_movement(db: Session, recurring_id: int, user_id: int) -> bool:
+    """
+    Stops a recurring template. Movements already materialized are kept.
+    
+    Args:
+        db: Database session
+        recurring_id: ID of the template to stop
+        user_id: ID of the user who owns the template
+    
+    Returns:
+        True if stopped, False if it didn't exist
+    """
+
+    db_recurring = db.scalars(
+        _ACTIVE_TEMPLATE_BY_ID,
+        {"recurring_id": recurring_id, "user_id": user_id}
+    ).first()
+
+    if db_recurring:
+        db_recurring.is_active = False      # type: ignore
+        db.commit()
+        return True
+
+    return False
+
+def materialize_recurring_movements(
+    db: Session,
+    until: date,
+    user_id: Optional[int]=None,
+    batch_size: int=500
+) -> int:
+    """
+    Inserts the movements of every recurring occurrence due up to `until`.
+
+    Occurrences are written with multi-row INSERT ... ON CONFLICT DO NOTHING
+    on the (recurring_id, occurrence_date) unique key, so running it again,
+    or from several workers at once, never duplicates a movement. After
+    downtime all missed occurrences are caught up in the same bulk insert.
+    
+    Args:
+        db: Database session
+        until: Last occurrence date to materialize (inclusive)
+        user_id: Restrict to the templates of one user (optional)
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Number of movements inserted
+    """
+
+    statement = lambda_stmt(lambda: select(RecurringMovement).where(
+        RecurringMovement.is_active.is_(True),
+        RecurringMovement.next_occurrence <= until
+    ))
+
+    if user_id is not None:
+        statement += lambda s: s.where(RecurringMovement.user_id == user_id)
+
+    rows = []
+
+    for template in db.scalars(statement).all():
+        next_index = template.occurrence_index
+
+        for index, occurrence in iter_occurrences(template, until, start_index=next_index):   # type: ignore
+            rows.append({
+                "amount": template.amount,
+                "type": template.type,
+                "description": template.description,
+                "date": datetime.combine(occurrence, time.min),
+                "user_id": template.user_id,
+                "recurring_id": template.id,
+                "occurrence_date": occurrence
+            })
+            next_index = index + 1
+
+        # Advance the cursor past the materialized occurrences
+        template.occurrence_index = next_index                              # type: ignore
+        template.next_occurrence = next_occurrence(template, next_index)    # type: ignore
+
+    inserted = []
+
+    for offset in range(0, len(rows), batch_size):
+        statement = _insert_ignore(db, Movement).values(
+            rows[offset:offset + batch_size]
+        ).on_conflict_do_nothing().returning(
+            Movement.user_id, Movement.type, Movement.amount, Movement.date
+        )
+        inserted.extend(db.execute(statement).all())
+
+    # One budget update per (user, type, month) instead of per movement
+    deltas: Dict[tuple, Decimal] = {}
+
+    for row in inserted:
+        key = (row.user_id, row.type, _budget_period(row.date))
+        deltas[key] = deltas.get(key, Decimal(0)) + _to_decimal(row.amount)
+
+    for (owner_id, movement_type, period), delta in deltas.items():
+        _apply_budget_delta(
+            db,
+            user_id=owner_id,
+            moment=_period_bounds(period)[0],
+            movement_type=movement_type,
+            delta=delta
+        )
+
+    for owner_id in {row.user_id for row in inserted}:
+        _bump_data_version(db, owner_id)
+
+    db.commit()
+
+    return len(inserted)
+
+def get_idempotency_key(db: Session, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """
+    Retrieves a stored idempotency key.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user who sent the request
+        key: Value of the Idempotency-Key header
+    
+    Returns:
+        The record if it exists, None if not found
+    """
+
+    return db.scalars(_IDEMPOTENCY_KEY, {"user_id": user_id, "key": key}).first()
+
+def save_idempotency_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    request_hash: str,
+    status_code: int,
+    response_body: str,
+    stale_before: datetime
+) -> None:
+    """
+    Stores the response of an idempotent request and commits the session,
+    so the key is saved in the same transaction as the write it protects.
+
+    A concurrent request that saved the same key first makes the commit
+    fail with IntegrityError (the write is not applied).
+    
+    Args:
+        db: Database session holding the pending write
+        user_id: ID of the user who sent the request
+        key: Value of the Idempotency-Key header
+        request_hash: Fingerprint of the request body
+        status_code: HTTP status of the response
+        response_body: Serialized JSON body of the response
+        stale_before: Expiration cutoff; an older row with the same key
+            (not purged yet) is replaced
+    """
+
+    db.execute(_DELETE_STALE_IDEMPOTENCY_KEY, {
+        "user_id": user_id,
+        "key": key,
+        "cutoff": stale_before
+    })
+    db.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status_code=status_code,
+        response_body=response_body
+    ))
+    db.commit()
+
+def delete_expired_idempotency_keys(db: Session, before: datetime) -> int:
+    """
+    Deletes the idempotency keys created before a given moment.
+    
+    Args:
+        db: Database session
+        before: Expiration cutoff
+    
+    Returns:
+        Number of keys deleted
+    """
+
+    deleted = db.execute(_DELETE_EXPIRED_IDEMPOTENCY_KEYS, {"cutoff": before}).rowcount
+    db.commit()
+
+    return deleted
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """
+    Retrieves the data version of a user, which changes on every write
+    to their movements.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user
+    
+    Returns:
+        The current version (0 if the user never wrote a movement)
+    """
+
+    return db.scalar(_DATA_VERSION, {"user_id": user_id}) or 0
+
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """
     Retrieves a user by their username.
@@ -203,4 +741,241 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
         The User object if it exists, None if not found.
     """
 
-    return db.query(User).filter(User.username == username).first()
\ No newline at end of file
+    return db.scalars(_USER_BY_USERNAME, {"username": username}).first()
+
+def create_budget(db: Session, budget: BudgetCreate, user_id: int) -> Budget:
+    """
+    Creates a monthly budget and seeds its counter from existing movements.
+
+    This is the only place where the movements of the period are summed;
+    afterwards the counter is maintained incrementally by the write path.
+    
+    Args:
+        db: Database session
+        budget: Budget data validated by BudgetCreate
+        user_id: ID of the user who owns the budget
+    
+    Returns:
+        The created budget (SQLAlchemy model)
+    """
+
+    start, end = _period_bounds(budget.period)
+    limit_amount = _to_decimal(budget.limit_amount)
+
+    db_budget = Budget(
+        period = budget.period,
+        movement_type = budget.movement_type.value if budget.movement_type else None,
+        limit_amount = limit_amount,
+        spent = 0,
+        alert_level = 0,
+        user_id = user_id
+    )
+
+    # The INSERT starts the write transaction before the movements are summed
+    db.add(db_budget)
+    db.flush()
+
+    spent = _to_decimal(db.scalar(_SEED_BUDGET, {
+        "budget_id": db_budget.id,
+        "owner_id": user_id,
+        "period_start": start,
+        "period_end": end
+    }))
+    db.execute(_SET_BUDGET_ALERT_LEVEL, {
+        "budget_id": db_budget.id,
+        "level": _alert_level(spent, limit_amount)
+    })
+
+    db.commit()
+    db.refresh(db_budget)
+
+    return db_budget
+
+def get_budgets(
+    db: Session,
+    user_id: int,
+    period: Optional[str]=None
+) -> List[Budget]:
+    """
+    Retrieves the budgets of a user.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user who owns the budgets
+        period: Month to filter by (YYYY-MM) (optional)
+    
+    Returns:
+        List of budgets
+    """
+
+    statement = lambda_stmt(lambda: select(Budget).where(Budget.user_id == user_id))
+
+    if period:
+        statement += lambda s: s.where(Budget.period == period)
+
+    statement += lambda s: s.order_by(Budget.period, Budget.id)
+
+    return db.scalars(statement).all()   # type: ignore
+
+def delete_budget(db: Session, budget_id: int, user_id: int) -> bool:
+    """
+    Deletes a budget together with its pending alerts.
+    
+    Args:
+        db: Database session
+        budget_id: ID of the budget to delete
+        user_id: ID of the user who owns the budget
+    
+    Returns:
+        True if deleted, False if it didn't exist
+    """
+
+    db_budget = db.scalars(
+        _USER_BUDGET_BY_ID,
+        {"budget_id": budget_id, "user_id": user_id}
+    ).first()
+
+    if db_budget:
+        db.delete(db_budget)
+        db.commit()
+        return True
+
+    return False
+
+def drain_budget_alerts(
+    db: Session,
+    user_id: Optional[int]=None,
+    batch_size: int=100
+) -> List[BudgetAlert]:
+    """
+    Takes the next batch of pending alerts from the outbox and marks
+    them as dispatched.
+    
+    Args:
+        db: Database session
+        user_id: Restrict the batch to one user (optional)
+        batch_size: Maximum number of alerts to drain
+    
+    Returns:
+        List of drained alerts, oldest first
+    """
+
+    statement = lambda_stmt(lambda: select(BudgetAlert).where(BudgetAlert.dispatched_at.is_(None)))
+
+    if user_id is not None:
+        statement += lambda s: s.where(BudgetAlert.user_id == user_id)
+
+    statement += lambda s: s.order_by(BudgetAlert.id).limit(batch_size)
+
+    alerts = db.scalars(statement).all()
+
+    if alerts:
+        dispatched_at = datetime.now(timezone.utc)
+
+        for alert in alerts:
+            alert.dispatched_at = dispatched_at # type: ignore
+
+        db.commit()
+
+    return alerts
+
+def _apply_budget_delta(
+    db: Session,
+    user_id: int,
+    moment: Optional[datetime],
+    movement_type: str,
+    delta: Decimal
+) -> None:
+    """
+    Adds `delta` to the budgets affected by a movement and queues an alert
+    when a threshold is crossed upwards. Only the (at most two) budgets of
+    the movement's month are touched, so the cost per write is constant.
+    Changes are left in the session for the caller to commit.
+    """
+
+    if not delta:
+        return
+
+    movement_type = MovementType(movement_type).value
+    period = _budget_period(moment or datetime.now(timezone.utc))
+
+    budgets = db.execute(_ADD_TO_BUDGETS, {
+        "owner_id": user_id,
+        "budget_period": period,
+        "budget_type": movement_type,
+        "delta": delta
+    }).all()
+
+    # The UPDATE holds the rows until commit, so levels are derived from
+    # totals no other transaction can change in the meantime
+    for budget in budgets:
+        spent = _to_decimal(budget.spent)
+        level = _alert_level(spent, _to_decimal(budget.limit_amount))
+
+        if level > budget.alert_level:
+            db.add(BudgetAlert(
+                budget_id=budget.id,
+                user_id=user_id,
+                level=level,
+                spent=spent,
+                limit_amount=budget.limit_amount
+            ))
+
+        # Lowering the level lets the alert fire again if it is re-crossed
+        if level != budget.alert_level:
+            db.execute(_SET_BUDGET_ALERT_LEVEL, {"budget_id": budget.id, "level": level})
+
+def _bump_data_version(db: Session, user_id: int) -> None:
+    # Invalidates cached per-user results (e.g. insights) on every write
+    db.execute(_BUMP_DATA_VERSION[db.get_bind().dialect.name], {"owner_id": user_id})
+
+def _projected_totals(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: date
+) -> Dict[str, Decimal]:
+    # Income/expense of recurring occurrences not materialized yet
+    totals = {"income": Decimal(0), "expense": Decimal(0)}
+
+    templates = db.scalars(
+        _DUE_TEMPLATES_FOR_USER,
+        {"user_id": user_id, "until": end_date}
+    ).all()
+
+    for template in templates:
+        occurrences = sum(1 for _ in iter_occurrences(
+            template,
+            end_date,
+            start_index=template.occurrence_index,  # type: ignore
+            since=start_date
+        ))
+        totals[template.type] += _to_decimal(template.amount) * occurrences   # type: ignore
+
+    return totals
+
+def _insert_ignore(db: Session, model):
+    # Dialect INSERT supporting ON CONFLICT DO NOTHING
+    return _DIALECT_INSERT[db.get_bind().dialect.name](model)
+
+def _alert_level(spent: Decimal, limit_amount: Decimal) -> int:
+    # Highest threshold reached by `spent`, or 0 if none
+    for level in BUDGET_ALERT_LEVELS:
+        if spent * 100 >= limit_amount * level:
+            return level
+
+    return 0
+
+def _budget_period(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+def _period_bounds(period: str) -> tuple[datetime, datetime]:
+    # [start, end) datetimes of a 'YYYY-MM' month
+    year, month = (int(part) for part in period.split("-"))
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+
+    return start, end
+
+def _to_decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
\ No newline at end of file
@@ -18,6 +18,20 @@ engine = create_engine(
     connect_args={'check_same_thread': False}
 )
 
+# Databases whose SQL the API speaks (ON CONFLICT upserts, string
+# aggregation, date arithmetic). Checked at startup rather than on the
+# first write.
+SUPPORTED_DIALECTS = ("sqlite", "postgresql")
+
+def check_dialect(engine) -> None:
+    if engine.dialect.name not in SUPPORTED_DIALECTS:
+        raise ValueError(
+            f"Unsupported database '{engine.dialect.name}': "
+            f"use one of {', '.join(SUPPORTED_DIALECTS)}"
+        )
+
+check_dialect(engine)
+
 # Session factory 
 SessionLocal = sessionmaker(
     autocommit=False,           # Don't autocommit 
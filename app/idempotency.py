@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Optional
+from os import getenv
+import json
+from sqlalchemy.orm import Session
+from app import crud
+
+# Seconds a key (and its stored response) stays valid
+IDEMPOTENCY_TTL_SECONDS = int(getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+# Completed responses kept in memory in front of the database
+IDEMPOTENCY_CACHE_SIZE = int(getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: str
+    created_at: datetime
+
+class IdempotencyStore:
+    """
+    Bounded dedupe store for write requests: an in-memory LRU of completed
+    responses backed by the idempotency_keys table, which is shared by all
+    workers and purged by the scheduler after IDEMPOTENCY_TTL_SECONDS.
+
+    A key is only ever written together with the write it protects (one
+    transaction), so there is no in-progress state to get stuck in, and
+    replays only read.
+    """
+
+    def __init__(self, max_size: int=IDEMPOTENCY_CACHE_SIZE, ttl_seconds: int=IDEMPOTENCY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._cache: "OrderedDict[tuple[int, str], StoredResponse]" = OrderedDict()
+        self._lock = Lock()
+
+    def lookup(self, db: Session, user_id: int, key: str) -> Optional[StoredResponse]:
+        """
+        Returns the response stored for `key`, or None when the request
+        has to run (unknown or expired key). Never writes.
+        """
+
+        with self._lock:
+            cached = self._cache.get((user_id, key))
+
+            if cached and not self._expired(cached):
+                self._cache.move_to_end((user_id, key))
+                return cached
+
+        record = crud.get_idempotency_key(db, user_id=user_id, key=key)
+
+        if record is None:
+            return None
+
+        stored = StoredResponse(
+            request_hash=record.request_hash,   # type: ignore
+            status_code=record.status_code,     # type: ignore
+            body=record.response_body,          # type: ignore
+            created_at=record.created_at        # type: ignore
+        )
+
+        if self._expired(stored):
+            return None
+
+        self._remember(user_id, key, stored)
+
+        return stored
+
+    def save(
+        self,
+        db: Session,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        body: str
+    ) -> None:
+        """
+        Stores the response for `key` and commits it together with the
+        write pending in `db`.
+
+        Raises IntegrityError (nothing committed) when a concurrent request
+        saved the same key first; its response can then be looked up.
+        """
+
+        crud.save_idempotency_key(
+            db,
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            status_code=status_code,
+            response_body=body,
+            stale_before=(datetime.now(timezone.utc) - self.ttl).replace(tzinfo=None)
+        )
+        self._remember(user_id, key, StoredResponse(
+            request_hash=request_hash,
+            status_code=status_code,
+            body=body,
+            created_at=datetime.now(timezone.utc)
+        ))
+
+    def purge(self, db: Session) -> int:
+        # Deletes the expired keys from memory and from the database
+        cutoff = datetime.now(timezone.utc) - self.ttl
+
+        with self._lock:
+            for cache_key in [k for k, v in self._cache.items() if self._expired(v)]:
+                del self._cache[cache_key]
+
+        return crud.delete_expired_idempotency_keys(db, before=cutoff.replace(tzinfo=None))
+
+    def _remember(self, user_id: int, key: str, stored: StoredResponse) -> None:
+        with self._lock:
+            self._cache[(user_id, key)] = stored
+            self._cache.move_to_end((user_id, key))
+
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def _expired(self, stored: StoredResponse) -> bool:
+        created_at = stored.created_at
+
+        # SQLite returns naive datetimes (stored in UTC)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        return created_at + self.ttl < datetime.now(timezone.utc)
+
+def request_fingerprint(payload: Any) -> str:
+    # SHA-256 of the canonical JSON form of a request body
+    return sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+store = IdempotencyStore()
\ No newline at end of file
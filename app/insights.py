@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from threading import Lock
+from typing import Any, Dict, Optional
+from os import getenv
+import numpy as np
+from sqlalchemy.orm import Session
+from app import crud
+from app.recurring import utc_today
+
+# Days of history used to estimate the average daily net flow
+FORECAST_LOOKBACK_DAYS = 90
+
+# Days of history used for the per-weekday expense baseline
+BASELINE_DAYS = 180
+
+# Only expenses from the last N days are reported as anomalies
+ANOMALY_WINDOW_DAYS = 30
+
+# Minimum z-score (and baseline size) for an expense to be flagged
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_MIN_SAMPLES = 5
+
+# Movements older than the longest window above are never read
+HISTORY_DAYS = max(FORECAST_LOOKBACK_DAYS, BASELINE_DAYS, ANOMALY_WINDOW_DAYS, 31)
+
+# Number of users whose insights are kept in memory
+INSIGHTS_CACHE_SIZE = int(getenv("INSIGHTS_CACHE_SIZE", "1024"))
+
+_cache: "OrderedDict[int, tuple[int, date, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = Lock()
+
+def get_insights(
+    db: Session,
+    user_id: int,
+    data_version: int,
+    today: Optional[date]=None
+) -> Dict[str, Any]:
+    """
+    Returns the spending insights of a user, memoized per data version.
+
+    Any movement write bumps the user's data version, so a cached entry
+    is reused until the user's history changes (or the day rolls over).
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+        data_version: Current data version of the user
+        today: Reference date (default: today, UTC)
+
+    Returns:
+        Dictionary matching the MovementInsights schema
+    """
+
+    today = today or utc_today()
+
+    with _cache_lock:
+        cached = _cache.get(user_id)
+
+        if cached and cached[0] == data_version and cached[1] == today:
+            _cache.move_to_end(user_id)
+            return cached[2]
+
+    # The all-time balance comes from the summary aggregate; only the
+    # recent history is loaded into arrays
+    balance = crud.get_balance_summary(db, user_id=user_id)["balance"]
+    since = datetime.combine(today - timedelta(days=HISTORY_DAYS), time.min)
+
+    columns = _to_columns(crud.get_movement_history(db, user_id=user_id, since=since))
+    result = compute_insights(*columns, balance=float(balance), today=today)
+
+    # Only the flagged movements need their exact date
+    dates = crud.get_movement_dates(db, [anomaly["id"] for anomaly in result["anomalies"]])
+
+    for anomaly in result["anomalies"]:
+        anomaly["date"] = dates[anomaly["id"]]
+
+    with _cache_lock:
+        _cache[user_id] = (data_version, today, result)
+        _cache.move_to_end(user_id)
+
+        while len(_cache) > INSIGHTS_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return result
+
+def compute_insights(
+    ids: np.ndarray,
+    amounts: np.ndarray,
+    is_expense: np.ndarray,
+    days: np.ndarray,
+    balance: float,
+    today: date
+) -> Dict[str, Any]:
+    """
+    Computes the forecast and anomalies over column arrays of the recent
+    history (`days` counts days since 1970-01-01).
+
+    - **Projected balance**: current balance plus the average daily net
+      flow of the last 90 days for each remaining day of the month.
+    - **Anomalies**: recent expenses whose z-score against the expenses of
+      the same weekday (last 180 days) reaches the threshold. Their date
+      is left for the caller to fill in.
+    """
+
+    today_day = np.datetime64(today, "D").astype(np.int64)
+    month_start = np.datetime64(today, "M").astype("datetime64[D]").astype(np.int64)
+    next_month = (np.datetime64(today, "M") + 1).astype("datetime64[D]").astype(np.int64)
+
+    signed = np.where(is_expense, -amounts, amounts)
+
+    # Month to date totals
+    in_month = (days >= month_start) & (days <= today_day)
+    month_income = float(amounts[in_month & ~is_expense].sum())
+    month_expense = float(amounts[in_month & is_expense].sum())
+
+    # Forecast from the average daily net flow
+    lookback = (days > today_day - FORECAST_LOOKBACK_DAYS) & (days <= today_day)
+    daily_net = float(signed[lookback].sum()) / FORECAST_LOOKBACK_DAYS
+    remaining_days = int(next_month - today_day) - 1
+    projected = balance + daily_net * remaining_days
+
+    # Per-weekday expense baseline (Monday = 0; 1970-01-01 was a Thursday)
+    weekdays = (days + 3) % 7
+    baseline = is_expense & (days > today_day - BASELINE_DAYS) & (days <= today_day)
+
+    counts = np.bincount(weekdays[baseline], minlength=7)
+    sums = np.bincount(weekdays[baseline], weights=amounts[baseline], minlength=7)
+    squares = np.bincount(weekdays[baseline], weights=amounts[baseline] ** 2, minlength=7)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+        stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0.0))
+
+    candidates = is_expense & (days > today_day - ANOMALY_WINDOW_DAYS) & (days <= today_day)
+    candidates &= (counts >= ANOMALY_MIN_SAMPLES)[weekdays] & (stds > 0)[weekdays]
+
+    z_scores = np.zeros_like(amounts)
+    z_scores[candidates] = (
+        (amounts[candidates] - means[weekdays[candidates]]) / stds[weekdays[candidates]]
+    )
+
+    flagged = np.flatnonzero(candidates & (z_scores >= ANOMALY_Z_THRESHOLD))
+    flagged = flagged[np.argsort(-z_scores[flagged], kind="stable")]
+
+    return {
+        "as_of": today,
+        "balance": round(balance, 2),
+        "month_income": round(month_income, 2),
+        "month_expense": round(month_expense, 2),
+        "projected_month_end_balance": round(projected, 2),
+        "anomalies": [
+            {
+                "id": int(ids[i]),
+                "amount": round(float(amounts[i]), 2),
+                "z_score": round(float(z_scores[i]), 2)
+            }
+            for i in flagged
+        ]
+    }
+
+def _to_columns(history: Optional[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Parses the comma-separated (id, amount, is_expense, day) groups.
+    # float64 holds the integer fields exactly (IDs and days stay < 2**53).
+    rows = np.fromstring(history or "", dtype=np.float64, sep=",").reshape(-1, 4)
+
+    return (
+        rows[:, 0].astype(np.int64),
+        rows[:, 1],
+        rows[:, 2].astype(bool),
+        rows[:, 3].astype(np.int64)
+    )
@@ -1,21 +1,50 @@
 from fastapi import FastAPI
-from app.routers import movement
+from fastapi.middleware.gzip import GZipMiddleware
+from os import getenv
+from app.routers import movement, budget, recurring
+from app.scheduler import lifespan
 from app.database import Base, engine
 from app.auth.router import router as auth_router
 
 # Required for table creation 
 from app.models.user import User # type: ignore
 from app.models.movement import Movement # type: ignore
+from app.models.budget import Budget, BudgetAlert # type: ignore
+from app.models.recurring import RecurringMovement # type: ignore
+from app.models.idempotency import IdempotencyKey # type: ignore
+from app.models.data_version import UserDataVersion # type: ignore
+from app.sharding import shard_router
+from app import migrations
 
 app = FastAPI(
     title="Personal Finance API",
     description="Personal finance management API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan       # Materializes recurring movements in the background
 )
 
+# Response compression: brotli when brotli-asgi is installed, gzip otherwise.
+# Bodies below the threshold (bytes) are sent as is.
+COMPRESSION_MIN_SIZE = int(getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+else:
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_fallback=True      # Clients without brotli still get gzip
+    )
+
 #Create all tables defined in the models
 Base.metadata.create_all(bind=engine)
+migrations.upgrade(engine)      # Columns/indexes added to existing tables
+shard_router.create_all()
 
 # Routers
 app.include_router(auth_router)
-app.include_router(movement.router)
\ No newline at end of file
+app.include_router(movement.router)
+app.include_router(budget.router)
+app.include_router(recurring.router)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Schema upgrades for databases created by earlier versions of the API.
+
+Base.metadata.create_all only creates missing tables: it never adds a
+column or an index to a table that already exists. upgrade() runs right
+after it on startup (for the main database and every shard) and brings
+existing tables up to date. Each step checks the live schema first, so
+it is safe to run on every start:
+
+    python -m app.migrations
+"""
+
+import logging
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+# Columns added to tables that existed before them: (table, column).
+# They must be nullable (or have a server default) to be added in place.
+ADDED_COLUMNS = (
+    ("movements", "recurring_id"),
+    ("movements", "occurrence_date"),
+    ("users", "shard"),
+)
+
+def upgrade(engine: Engine) -> List[str]:
+    """
+    Adds the missing columns and indexes to the existing tables.
+
+    Args:
+        engine: Engine of the database to upgrade
+
+    Returns:
+        Description of each applied step (empty when up to date)
+    """
+
+    applied: List[str] = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as connection:
+        for table_name, column_name in ADDED_COLUMNS:
+            if table_name not in existing_tables:
+                continue
+
+            if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+                continue
+
+            column = Base.metadata.tables[table_name].c[column_name]
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+            applied.append(f"added column {table_name}.{column_name}")
+
+        # Indexes (unique keys included) declared after their table was created
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    applied.append(f"created index {index.name}")
+
+    for step in applied:
+        logger.info("Schema upgrade: %s", step)
+
+    return applied
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    import app.main     # noqa: F401  Registers the models and upgrades every database
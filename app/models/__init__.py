@@ -1,2 +1,6 @@
 from .movement import Movement
-from .user import User
\ No newline at end of file
+from .user import User
+from .budget import Budget, BudgetAlert
+from .recurring import RecurringMovement
+from .idempotency import IdempotencyKey
+from .data_version import UserDataVersion
\ No newline at end of file
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, Numeric, String, ForeignKey, DateTime, UniqueConstraint, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from app.database import Base
+
+class Budget(Base):
+    __tablename__ = 'budgets'
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "movement_type", name="uq_budget_scope"),
+        # NULLs are distinct in the constraint above: one overall budget per month
+        Index(
+            "uq_budget_overall",
+            "user_id",
+            "period",
+            unique=True,
+            sqlite_where=text("movement_type IS NULL"),
+            postgresql_where=text("movement_type IS NULL")
+        ),
+        {"sqlite_autoincrement": True},     # Per-shard ID range: see Movement
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)     # 'YYYY-MM'
+    movement_type = Column(String(20), nullable=True)           # Always None: all expenses
+    limit_amount = Column(Numeric(10, 2), nullable=False)
+
+    # Running total kept up to date by the movement write path
+    spent = Column(Numeric(12, 2), nullable=False, default=0)
+    alert_level = Column(Integer, nullable=False, default=0)    # 0, 80 or 100
+
+    # Owner; no foreign key, users live in the directory database
+    user_id = Column(Integer, index=True)
+    alerts = relationship("BudgetAlert", back_populates="budget", cascade="all, delete-orphan")
+
+class BudgetAlert(Base):
+    # Outbox of threshold crossings, drained in batches by consumers
+    __tablename__ = 'budget_alerts'
+    __table_args__ = {"sqlite_autoincrement": True}     # Per-shard ID range: see Movement
+
+    id = Column(Integer, primary_key=True, index=True)
+    level = Column(Integer, nullable=False)
+    spent = Column(Numeric(12, 2), nullable=False)
+    limit_amount = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    dispatched_at = Column(DateTime, nullable=True, index=True)
+
+    budget_id = Column(Integer, ForeignKey("budgets.id"), index=True)
+    user_id = Column(Integer, index=True)
+    budget = relationship("Budget", back_populates="alerts")
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer
+from app.database import Base
+
+class UserDataVersion(Base):
+    # Bumped on every movement write; lives next to the user's movements
+    __tablename__ = 'user_data_versions'
+
+    user_id = Column(Integer, primary_key=True)     # No foreign key: see Movement.user_id
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from datetime import datetime, timezone
+from app.database import Base
+
+class IdempotencyKey(Base):
+    # Stored response of a write request, replayed when the key is reused
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+        {"sqlite_autoincrement": True},     # Per-shard ID range: see Movement
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)   # SHA-256 of the request body
+
+    # The key is saved together with its response, in one transaction
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    user_id = Column(Integer, index=True)     # No foreign key: see Movement.user_id
@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, Numeric, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Numeric, String, ForeignKey, DateTime, Date, Index
 from datetime import datetime, timezone
 from app.database import Base
 
 class Movement(Base):
     __tablename__ = 'movements'
+    __table_args__ = (
+        # History scans and summaries per user; type and amount make the
+        # index covering, so those queries never read the table
+        Index("ix_movements_user_date", "user_id", "date", "type", "amount"),
+        # One movement per recurring occurrence. A unique index rather than a
+        # constraint, so app.migrations can add it to existing tables.
+        Index("uq_movement_occurrence", "recurring_id", "occurrence_date", unique=True),
+        # IDs never reused, so each shard keeps its own range (app.sharding)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
@@ -12,6 +21,9 @@ class Movement(Base):
     description = Column(String(255))
     date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
-    # Relationship with User
-    user_id = Column(Integer, ForeignKey("users.id"))
-    user = relationship("User", back_populates="movements")
\ No newline at end of file
+    # Owner; no foreign key, users live in the directory database
+    user_id = Column(Integer)
+
+    # Set when the movement was materialized from a recurring template
+    recurring_id = Column(Integer, ForeignKey("recurring_movements.id"), nullable=True)
+    occurrence_date = Column(Date, nullable=True)
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, Numeric, String, Date, Boolean
+from app.database import Base
+
+class RecurringMovement(Base):
+    # Template materialized into movements by the scheduler
+    __tablename__ = 'recurring_movements'
+    __table_args__ = {"sqlite_autoincrement": True}     # Per-shard ID range: see Movement
+
+    id = Column(Integer, primary_key=True, index=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    type = Column(String(20), nullable=False)
+    description = Column(String(255))
+
+    # Schedule: every `interval` days/weeks/months/years from start_date
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+
+    # Materialization cursor (next_occurrence is None once the schedule ends)
+    occurrence_index = Column(Integer, nullable=False, default=0)
+    next_occurrence = Column(Date, nullable=True, index=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+
+    # Owner; no foreign key, users live in the directory database
+    user_id = Column(Integer, index=True)
@@ -1,5 +1,4 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -12,5 +11,7 @@ class User(Base):
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    shard = Column(String(50), nullable=True)    # Database holding the user's data
 
-    movements = relationship('Movement', back_populates="user")
\ No newline at end of file
+    # No relationships to movements, budgets...: they live on the user's
+    # shard, another database (see app.sharding)
\ No newline at end of file
@@ -0,0 +1,80 @@
+from calendar import monthrange
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional, Tuple
+from app.models import RecurringMovement
+
+def utc_today() -> date:
+    # Movement dates default to UTC, so "today" must be the UTC date too
+    return datetime.now(timezone.utc).date()
+
+def occurrence_date(template: RecurringMovement, index: int) -> Optional[date]:
+    """
+    Date of the `index`-th occurrence (0-based) of a recurring template,
+    or None when it falls after the last representable date (9999-12-31).
+
+    Occurrences are always computed from start_date, so monthly schedules
+    starting on the 31st fall on the last day of shorter months without
+    drifting afterwards.
+    """
+
+    start: date = template.start_date   # type: ignore
+    step = template.interval * index
+
+    try:
+        if template.frequency == "daily":
+            return start + timedelta(days=step)
+        if template.frequency == "weekly":
+            return start + timedelta(weeks=step)
+        if template.frequency == "monthly":
+            return _add_months(start, step)
+        if template.frequency == "yearly":
+            return _add_months(start, 12 * step)
+    except OverflowError:
+        return None
+
+    raise ValueError(f"Unknown frequency: {template.frequency}")
+
+def iter_occurrences(
+    template: RecurringMovement,
+    until: date,
+    start_index: int=0,
+    since: Optional[date]=None
+) -> Iterator[Tuple[int, date]]:
+    """
+    Yields (index, date) for the occurrences of a template up to `until`
+    (inclusive), starting at `start_index` and skipping dates before `since`.
+    """
+
+    index = start_index
+    last = min(until, template.end_date) if template.end_date else until   # type: ignore
+
+    while True:
+        current = occurrence_date(template, index)
+
+        if current is None or current > last:
+            return
+        if since is None or current >= since:
+            yield index, current
+
+        index += 1
+
+def next_occurrence(template: RecurringMovement, index: int) -> Optional[date]:
+    # Date of occurrence `index`, or None if it falls after end_date (or
+    # after the last representable date)
+    current = occurrence_date(template, index)
+
+    if current is None or (template.end_date and current > template.end_date):   # type: ignore
+        return None
+
+    return current
+
+def _add_months(start: date, months: int) -> date:
+    month_index = start.month - 1 + months
+    year = start.year + month_index // 12
+    month = month_index % 12 + 1
+
+    # Same error as date + timedelta past date.max
+    if year > date.max.year:
+        raise OverflowError("date value out of range")
+
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
\ No newline at end of file
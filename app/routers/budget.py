@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app import crud
+from app.schemas import BudgetCreate, BudgetOut, BudgetAlertOut
+from app.auth.dependencies import get_current_user, get_user_db
+from app.models.user import User
+
+router = APIRouter(
+    prefix="/budgets",
+    tags=["budgets"]
+)
+
+@router.post("/", response_model=BudgetOut, status_code=201)
+def create_budget(
+    budget: BudgetCreate,
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates a monthly budget.
+
+    - **period**: Month covered by the budget (YYYY-MM)
+    - **movement_type**: 'expense' or empty (the same budget: all expenses)
+    - **limit_amount**: Monthly limit (must be positive)
+
+    Alerts are queued when spending reaches 80% and 100% of the limit.
+    """
+
+    try:
+        return crud.create_budget(
+            db=db,
+            budget=budget,
+            user_id=current_user.id # type: ignore
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="A budget already exists for this period"
+        )
+
+@router.get("/", response_model=List[BudgetOut])
+def read_budgets(
+    period: Optional[str]=Query(
+        None,
+        description="Filter budgets by month (YYYY-MM)",
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])$"
+    ),
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves the budgets of the current user with their spending so far.
+
+    - **period**: Month (optional)
+    """
+
+    return crud.get_budgets(
+        db=db,
+        user_id=current_user.id,    # type: ignore
+        period=period
+    )
+
+@router.get("/alerts", response_model=List[BudgetAlertOut])
+def drain_alerts(
+    batch_size: int=Query(100, ge=1, le=500, description="Maximum alerts to return"),
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Drains the next batch of pending budget alerts.
+
+    Each alert is returned only once.
+    """
+
+    return crud.drain_budget_alerts(
+        db=db,
+        user_id=current_user.id,    # type: ignore
+        batch_size=batch_size
+    )
+
+@router.delete("/{budget_id}", status_code=204)
+def delete_budget(
+    budget_id: int,
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Deletes a budget.
+
+    - **budget_id**: ID of the budget to delete
+    """
+
+    deleted = crud.delete_budget(
+        db,
+        budget_id=budget_id,
+        user_id=current_user.id     # type: ignore
+    )
+
+    if not deleted:
+        raise HTTPException(
+            status_code=404,
+            detail="Budget not found"
+        )
+
+    return None
\ No newline at end of file
@@ -1,12 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from app import crud
 from datetime import date
-from app.schemas import MovementCreate, MovementOut, MovementUpdate, BalanceSummary
-from app.auth.dependencies import get_current_user
+from os import getenv
+from app.schemas import MovementCreate, MovementOut, MovementUpdate, BalanceSummary, MovementInsights
+from app import insights, idempotency
+from app.auth.dependencies import get_current_user, get_user_db
 from app.models.user import User
-from app.database import get_db
+from app.sharding import shard_router
+
+# Largest page accepted by GET /movements/
+MAX_PAGE_LIMIT = int(getenv("MAX_PAGE_LIMIT", "1000"))
+
+# Pages larger than this are streamed row by row instead of built in memory
+STREAM_PAGE_THRESHOLD = int(getenv("STREAM_PAGE_THRESHOLD", "500"))
+
+# Limits in (STREAM_PAGE_THRESHOLD, MAX_PAGE_LIMIT] are streamed; with no
+# such limit the streaming mode could never run
+if STREAM_PAGE_THRESHOLD >= MAX_PAGE_LIMIT:
+    raise ValueError("STREAM_PAGE_THRESHOLD must be lower than MAX_PAGE_LIMIT")
+
+# Rows serialized per streamed chunk
+STREAM_BATCH_SIZE = 500
 
 router = APIRouter(
     prefix="/movements",
@@ -16,7 +34,13 @@ router = APIRouter(
 @router.post("/", response_model=MovementOut, status_code=201)
 def create_movement(
     movement: MovementCreate,
-    db: Session=Depends(get_db),
+    idempotency_key: Optional[str]=Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Unique key per logical request; retries with it replay the first response"
+    ),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -27,19 +51,52 @@ def create_movement(
     - **description**: Optional description
     - **date**: Optional date (default: now)
     - **user_id**: Associated user ID (required)
+
+    Send an **Idempotency-Key** header to make retries safe: a request
+    reusing the key gets the stored response and creates nothing.
     """
 
-    try:
-        return crud.create_movement(
-            db=db,
-            movement=movement,
-            user_id=current_user.id # type: ignore
-        )
-    except Exception as error:
+    if not idempotency_key:
+        return _create_movement(db, movement, current_user.id)  # type: ignore
+
+    user_id: int = current_user.id  # type: ignore
+    request_hash = idempotency.request_fingerprint(movement.model_dump(mode="json"))
+
+    # Replays are served by a read, without touching the write path
+    stored = idempotency.store.lookup(db, user_id, idempotency_key)
+
+    if stored is None:
+        # The movement stays pending until save() commits it with the key
+        db_movement = _create_movement(db, movement, user_id, commit=False)
+        body = MovementOut.model_validate(db_movement).model_dump_json()
+
+        try:
+            idempotency.store.save(db, user_id, idempotency_key, request_hash, 201, body)
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            db.rollback()
+            stored = idempotency.store.lookup(db, user_id, idempotency_key)
+
+            if stored is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A concurrent request with this Idempotency-Key failed, retry it"
+                )
+        else:
+            return Response(content=body, status_code=201, media_type="application/json")
+
+    if stored.request_hash != request_hash:
         raise HTTPException(
-            status_code=400,
-            detail=str(error)
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request"
         )
+
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
     
 @router.get("/", response_model=List[MovementOut])
 def read_movements(
@@ -56,9 +113,14 @@ def read_movements(
         description="Type of movement: 'income' or 'expense'",
         regex="^(income|expense)$"
     ),
-    skip: int=0,
-    limit: int=100,
-    db: Session=Depends(get_db),
+    skip: int=Query(0, ge=0),
+    limit: int=Query(
+        min(100, MAX_PAGE_LIMIT),
+        ge=1,
+        le=MAX_PAGE_LIMIT,
+        description=f"Maximum number of records (up to {MAX_PAGE_LIMIT})"
+    ),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -68,7 +130,9 @@ def read_movements(
     - **end_date**: End date (inclusive)
     - **movement_type**: 'income' or 'expense'
     - **skip**: Pagination (records to skip)
-    - **limit**: Maximum number of records (up to 100)
+    - **limit**: Maximum number of records (up to MAX_PAGE_LIMIT, default 100)
+
+    Pages larger than STREAM_PAGE_THRESHOLD are streamed as a JSON array.
     """
 
     # Additional date validation 
@@ -78,6 +142,21 @@ def read_movements(
             detail="The start date cannot be greater than the end date"
         )
     
+    # Large pages: serialize rows as they come off the cursor
+    if limit > STREAM_PAGE_THRESHOLD:
+        return StreamingResponse(
+            _stream_movements(
+                shard=shard_router.shard_of(current_user),
+                user_id=current_user.id,    # type: ignore
+                start_date=start_date,
+                end_date=end_date,
+                movement_type=movement_type,
+                skip=skip,
+                limit=limit
+            ),
+            media_type="application/json"
+        )
+
     # Call the CRUD function with the filters
     return crud.get_movements(
         db=db,
@@ -93,7 +172,11 @@ def read_movements(
 def get_financial_summary(
     start_date: Optional[date]=Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date]=Query(None, description="End date (YYYY-MM-DD)"),
-    db: Session=Depends(get_db),
+    include_projected: bool=Query(
+        False,
+        description="Add recurring occurrences up to end_date not yet materialized"
+    ),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -102,7 +185,9 @@ def get_financial_summary(
     - Total expenses
     - Balance
 
-    Optional date filters.
+    Optional date filters. With **include_projected** (requires an
+    **end_date**), future recurring occurrences are counted without being
+    created.
     """
 
     if start_date and end_date and start_date > end_date:
@@ -110,18 +195,46 @@ def get_financial_summary(
             status_code=400,
             detail="The start date cannot be greater than the end date"
         )
+
+    # Projections run up to a date; without one there is nothing to add
+    if include_projected and not end_date:
+        raise HTTPException(
+            status_code=400,
+            detail="include_projected requires an end_date"
+        )
     
     return crud.get_balance_summary(
         db=db,
         user_id=current_user.id, # type: ignore
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        include_projected=include_projected
+    )
+
+@router.get("/insights", response_model=MovementInsights)
+def get_movement_insights(
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Spending insights with:
+    - Month to date income and expenses
+    - Projected end-of-month balance
+    - Anomalous expenses of the last 30 days (per-weekday z-score)
+
+    Results are cached until the user's movements change.
+    """
+
+    return insights.get_insights(
+        db=db,
+        user_id=current_user.id,    # type: ignore
+        data_version=crud.get_data_version(db, current_user.id) # type: ignore
     )
 
 @router.get("/{movement_id}", response_model=MovementOut)
 def read_movement(
     movement_id: int,
-    db: Session=Depends(get_db),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -144,7 +257,7 @@ def read_movement(
 def update_movement(
     movement_id: int,
     movement: MovementUpdate,
-    db: Session=Depends(get_db),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -174,7 +287,7 @@ def update_movement(
 @router.delete("/{movement_id}", status_code=204)
 def delete_movement(
     movement_id: int,
-    db: Session=Depends(get_db),
+    db: Session=Depends(get_user_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -193,4 +306,47 @@ def delete_movement(
     
     crud.delete_movement(db, movement_id=movement_id)
 
-    return None
\ No newline at end of file
+    return None
+
+def _stream_movements(shard: str, **filters) -> Iterator[str]:
+    """
+    Yields a JSON array of movements in chunks of STREAM_BATCH_SIZE rows.
+
+    Uses its own session: the request session is closed by get_user_db
+    before the response body is sent.
+    """
+
+    db = shard_router.session(shard)
+
+    try:
+        yield "["
+
+        separator = ""
+        chunk: List[str] = []
+
+        for db_movement in crud.iter_movements(db, batch_size=STREAM_BATCH_SIZE, **filters):
+            chunk.append(separator + MovementOut.model_validate(db_movement).model_dump_json())
+            separator = ","
+
+            if len(chunk) >= STREAM_BATCH_SIZE:
+                yield "".join(chunk)
+                chunk.clear()
+
+        yield "".join(chunk) + "]"
+    finally:
+        db.close()
+
+def _create_movement(db: Session, movement: MovementCreate, user_id: int, commit: bool=True):
+    try:
+        return crud.create_movement(
+            db=db,
+            movement=movement,
+            user_id=user_id,
+            commit=commit
+        )
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=str(error)
+        )
\ No newline at end of file
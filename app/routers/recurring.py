@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from app import crud
+from app.recurring import utc_today
+from app.schemas import RecurringMovementCreate, RecurringMovementOut
+from app.auth.dependencies import get_current_user, get_user_db
+from app.models.user import User
+
+router = APIRouter(
+    prefix="/recurring",
+    tags=["recurring"]
+)
+
+@router.post("/", response_model=RecurringMovementOut, status_code=201)
+def create_recurring_movement(
+    recurring: RecurringMovementCreate,
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates a recurring movement (salary, rent, subscriptions...).
+
+    - **amount**: Amount of each occurrence (must be positive)
+    - **type**: Movement type (income/expense)
+    - **description**: Optional description
+    - **frequency**: daily, weekly, monthly or yearly
+    - **interval**: Repeat every N periods (default: 1)
+    - **start_date**: Date of the first occurrence
+    - **end_date**: Optional last date
+
+    Occurrences already due are materialized right away.
+    """
+
+    db_recurring = crud.create_recurring_movement(
+        db=db,
+        recurring=recurring,
+        user_id=current_user.id # type: ignore
+    )
+
+    crud.materialize_recurring_movements(
+        db=db,
+        until=utc_today(),
+        user_id=current_user.id # type: ignore
+    )
+    db.refresh(db_recurring)
+
+    return db_recurring
+
+@router.get("/", response_model=List[RecurringMovementOut])
+def read_recurring_movements(
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves the active recurring movements of the current user.
+    """
+
+    return crud.get_recurring_movements(
+        db=db,
+        user_id=current_user.id # type: ignore
+    )
+
+@router.delete("/{recurring_id}", status_code=204)
+def delete_recurring_movement(
+    recurring_id: int,
+    db: Session=Depends(get_user_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stops a recurring movement. Movements already created are kept.
+
+    - **recurring_id**: ID of the recurring movement to stop
+    """
+
+    stopped = crud.deactivate_recurring_movement(
+        db,
+        recurring_id=recurring_id,
+        user_id=current_user.id     # type: ignore
+    )
+
+    if not stopped:
+        raise HTTPException(
+            status_code=404,
+            detail="Recurring movement not found"
+        )
+
+    return None
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Background materialization of recurring movements (and cleanup of expired
+idempotency keys).
+
+Runs inside the API process (started from the FastAPI lifespan) or as a
+standalone worker:
+
+    python -m app.scheduler          # Loop forever
+    python -m app.scheduler --once   # Catch up once and exit
+
+Set RECURRING_SCHEDULER=0 to keep the API from running its own loop when a
+standalone worker is deployed.
+"""
+
+import asyncio
+import logging
+import sys
+from contextlib import asynccontextmanager
+from datetime import date
+from os import getenv
+from fastapi import FastAPI
+from app import crud, idempotency
+from app.recurring import utc_today
+from app.sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two materialization runs
+RECURRING_INTERVAL_SECONDS = int(getenv("RECURRING_INTERVAL_SECONDS", "3600"))
+
+# Whether the API process runs the scheduler loop
+RECURRING_SCHEDULER_ENABLED = getenv("RECURRING_SCHEDULER", "1") != "0"
+
+def run_once(until: date | None=None) -> int:
+    # Materializes every occurrence due up to `until` (default: today, UTC)
+    return sum(
+        crud.materialize_recurring_movements(db, until=until or utc_today())
+        for db in shard_router.sessions()
+    )
+
+def purge_idempotency_keys() -> int:
+    # Deletes the idempotency keys older than their TTL
+    return sum(idempotency.store.purge(db) for db in shard_router.sessions())
+
+async def run_forever(interval: int=RECURRING_INTERVAL_SECONDS) -> None:
+    while True:
+        try:
+            inserted = await asyncio.to_thread(run_once)
+
+            if inserted:
+                logger.info("Materialized %d recurring movements", inserted)
+        except Exception:
+            logger.exception("Recurring movement materialization failed")
+
+        try:
+            await asyncio.to_thread(purge_idempotency_keys)
+        except Exception:
+            logger.exception("Idempotency key cleanup failed")
+
+        await asyncio.sleep(interval)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    task = asyncio.create_task(run_forever()) if RECURRING_SCHEDULER_ENABLED else None
+
+    try:
+        yield
+    finally:
+        if task:
+            task.cancel()
+
+if __name__ == "__main__":
+    import app.main     # noqa: F401  Registers the models and creates the tables
+
+    logging.basicConfig(level=logging.INFO)
+
+    if "--once" in sys.argv:
+        print(f"Materialized {run_once()} recurring movements")
+    else:
+        asyncio.run(run_forever())
\ No newline at end of file
@@ -1,3 +1,6 @@
 from .user import UserCreate, UserOut, UserUpdate
 from .movement import MovementCreate, MovementUpdate, MovementOut
-from .summary import BalanceSummary
\ No newline at end of file
+from .summary import BalanceSummary
+from .budget import BudgetCreate, BudgetOut, BudgetAlertOut
+from .insights import MovementInsights, AnomalousMovement
+from .recurring import RecurringMovementCreate, RecurringMovementOut
\ No newline at end of file
@@ -0,0 +1,53 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from app.schemas.movement import MovementType
+
+# Common base schema
+class BudgetBase(BaseModel):
+    period: str = Field(
+        ...,
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])$",
+        description="Budget month (YYYY-MM)",
+        examples=["2025-07"]
+    )
+    movement_type: Optional[MovementType] = Field(
+        None,
+        description="Only 'expense' (or empty): budgets cap spending"
+    )
+    limit_amount: float = Field(..., gt=0, description="Monthly limit", examples=[1200.00])
+
+# Schema for creation
+class BudgetCreate(BudgetBase):
+    @field_validator("movement_type")
+    @classmethod
+    def check_movement_type(cls, value: Optional[MovementType]) -> Optional[MovementType]:
+        # Income has no spending to cap
+        if value == MovementType.INCOME:
+            raise ValueError("Budgets only cover expenses")
+
+        # 'expense' is the overall budget: store it as one, so the month
+        # can only have a single budget
+        return None
+
+# Schema for response (includes running counters)
+class BudgetOut(BudgetBase):
+    id: int
+    user_id: int
+    spent: float = Field(..., description="Amount accumulated so far in the period")
+    alert_level: int = Field(..., description="Highest threshold reached: 0, 80 or 100")
+
+    class Config:
+        from_attributes = True          # Enables ORM compatibility
+
+# Schema for alerts drained from the outbox
+class BudgetAlertOut(BaseModel):
+    id: int
+    budget_id: int
+    level: int = Field(..., description="Threshold crossed: 80 or 100")
+    spent: float
+    limit_amount: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True          # Enables ORM compatibility
\ No newline at end of file
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from pydantic import BaseModel, Field
+from typing import List
+
+class AnomalousMovement(BaseModel):
+    """
+    Expense flagged as unusual against the user's baseline
+    for the same weekday.
+    """
+
+    id: int
+    date: datetime
+    amount: float
+    z_score: float=Field(
+        ...,
+        description="Standard deviations above the weekday average",
+        examples=[3.4]
+    )
+
+class MovementInsights(BaseModel):
+    """
+    Schema for the spending insights response.
+    Contains the month to date totals, the projected end-of-month
+    balance and the anomalous expenses of the last 30 days.
+    """
+
+    as_of: date
+    balance: float=Field(..., description="Current balance (all movements)", examples=[2450.75])
+    month_income: float=Field(..., description="Income of the current month so far", ge=0)
+    month_expense: float=Field(..., description="Expenses of the current month so far", ge=0)
+    projected_month_end_balance: float=Field(
+        ...,
+        description="Balance expected at the end of the month at the recent daily rate",
+        examples=[2210.40]
+    )
+    anomalies: List[AnomalousMovement]=[]
\ No newline at end of file
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from enum import Enum
+from app.schemas.movement import MovementType
+from app.recurring import utc_today
+
+# Past occurrences are created in the request that declares the template,
+# so its start_date may go back at most this many days
+MAX_BACKFILL_DAYS = 366
+
+# Enum for schedule frequency
+class Frequency(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+# Common base schema
+class RecurringMovementBase(BaseModel):
+    amount: float = Field(..., gt=0, description="Positive amount of each occurrence")
+    type: MovementType = Field(..., description="Type of movement: income or expense")
+    description: Optional[str] = Field(None, max_length=255)
+    frequency: Frequency = Field(..., description="daily, weekly, monthly or yearly")
+    interval: int = Field(1, ge=1, le=366, description="Repeat every N periods")
+    start_date: date = Field(..., description="Date of the first occurrence (up to 366 days ago)")
+    end_date: Optional[date] = Field(None, description="Last possible occurrence date")
+
+# Schema for creation
+class RecurringMovementCreate(RecurringMovementBase):
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date and self.end_date < self.start_date:
+            raise ValueError("The end date cannot be earlier than the start date")
+
+        if self.start_date < utc_today() - timedelta(days=MAX_BACKFILL_DAYS):
+            raise ValueError(f"The start date cannot be more than {MAX_BACKFILL_DAYS} days ago")
+
+        return self
+
+# Schema for response
+class RecurringMovementOut(RecurringMovementBase):
+    id: int
+    user_id: int
+    next_occurrence: Optional[date] = None
+    is_active: bool
+
+    class Config:
+        from_attributes = True          # Enables ORM compatibility
\ No newline at end of file
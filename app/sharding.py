@@ -0,0 +1,346 @@
+"""
+Per-user sharding of movement data across several databases.
+
+The users table stays in the main database (DATABASE_URL), which acts as
+the directory. Everything else a user owns (movements, budgets, recurring
+templates, idempotency keys...) lives in one of the SHARD_URLS databases,
+chosen with a consistent hash ring on the user ID and pinned in
+users.shard. Every query in app/crud.py is scoped by user, so a request
+only ever touches its caller's shard and writes of users on different
+shards no longer serialize on the same SQLite lock.
+
+Shards are named by position (shard0, shard1...): only append new URLs.
+Users registered before sharding have no shard and live in shard0, so
+keep the original database as the first entry when enabling it.
+
+Record IDs are unique across shards: shard N allocates them from
+N * SHARD_ID_RANGE + 1 on (AUTOINCREMENT sequence on SQLite, the serial
+sequence on PostgreSQL). A moved user keeps every ID, so IDs held by
+clients or stored in idempotent responses stay valid.
+
+Adding a shard only moves the users whose ring position changed:
+
+    python -m app.sharding status
+    python -m app.sharding rebalance [--dry-run]
+"""
+
+import logging
+import sys
+from bisect import bisect
+from hashlib import md5
+from typing import Dict, Iterator, List
+from os import getenv
+from sqlalchemy import create_engine, select, insert, delete, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import Base, SessionLocal, SQLALCHEMY_DATABASE_URL, check_dialect
+from app import migrations
+from app.models import (
+    User, Movement, Budget, BudgetAlert, RecurringMovement, IdempotencyKey, UserDataVersion
+)
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated database URLs; defaults to the main database only
+SHARD_URLS = [url.strip() for url in getenv("SHARD_URLS", "").split(",") if url.strip()]
+
+# Points per shard on the hash ring (more points, more even spread)
+SHARD_VIRTUAL_NODES = 64
+
+# Tables holding per-user data, parents before children
+SHARDED_MODELS = (RecurringMovement, Budget, Movement, BudgetAlert, IdempotencyKey, UserDataVersion)
+
+# IDs available to each shard (shard N starts at N * SHARD_ID_RANGE + 1).
+# Stays below 2**53 (exact in JSON clients) for up to 9000 shards.
+SHARD_ID_RANGE = 10 ** 12
+
+def _hash(value: str) -> int:
+    # Stable across processes (unlike hash())
+    return int.from_bytes(md5(value.encode()).digest()[:8], "big")
+
+class ShardRouter:
+    """
+    Maps users to shard databases with consistent hashing.
+
+    Each shard owns SHARD_VIRTUAL_NODES points on a ring; a user belongs to
+    the first point after the hash of their ID. Adding a shard only takes
+    over the users between its points and their predecessors.
+    """
+
+    def __init__(self, urls: List[str], virtual_nodes: int=SHARD_VIRTUAL_NODES):
+        self.names = [f"shard{index}" for index in range(len(urls))]
+        self._sessions: Dict[str, sessionmaker] = {}
+
+        for name, url in zip(self.names, urls):
+            if url == SQLALCHEMY_DATABASE_URL:
+                # Reuse the main engine rather than opening the file twice
+                self._sessions[name] = SessionLocal
+            else:
+                engine = create_engine(url, connect_args={'check_same_thread': False})
+                check_dialect(engine)
+
+                self._sessions[name] = sessionmaker(
+                    autocommit=False,
+                    autoflush=False,
+                    bind=engine
+                )
+
+        ring = sorted(
+            (_hash(f"{name}#{node}"), name)
+            for name in self.names
+            for node in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [name for _, name in ring]
+
+    def shard_for(self, user_id: int) -> str:
+        # Shard assigned by the ring (where a new user is placed)
+        index = bisect(self._points, _hash(str(user_id))) % len(self._points)
+        return self._owners[index]
+
+    def shard_of(self, user: User) -> str:
+        # Shard currently holding the user's data
+        return user.shard or self.names[0]     # type: ignore
+
+    def session(self, name: str) -> Session:
+        return self._sessions[name]()
+
+    def session_for(self, user: User) -> Session:
+        return self.session(self.shard_of(user))
+
+    def sessions(self) -> Iterator[Session]:
+        # One session per shard, closed once the caller moves on
+        for name in self.names:
+            db = self.session(name)
+
+            try:
+                yield db
+            finally:
+                db.close()
+
+    def create_all(self) -> None:
+        # Creates (or upgrades) the tables on every shard. Only the main
+        # database holds users; other shards get the per-user tables alone.
+        for index, name in enumerate(self.names):
+            engine = self._sessions[name].kw["bind"]
+            tables = None if engine is SessionLocal.kw["bind"] else [
+                model.__table__ for model in SHARDED_MODELS
+            ]
+
+            Base.metadata.create_all(bind=engine, tables=tables)
+            migrations.upgrade(engine)
+            _reserve_id_range(engine, name, index * SHARD_ID_RANGE)
+
+shard_router = ShardRouter(SHARD_URLS or [SQLALCHEMY_DATABASE_URL])
+
+def rebalance(dry_run: bool=False) -> Dict[str, int]:
+    """
+    Moves every user whose data is not on the shard the ring assigns.
+
+    Run it with the API stopped: writes made during a move are lost.
+    Records keep their IDs. Users only ever move to a shard appended after
+    theirs, so copied IDs are always below the target's own range.
+
+    A move copies the rows, flips users.shard, then deletes the source
+    rows. It starts by deleting every user's rows from the shards
+    users.shard does not point to, so a re-run finishes a move that was
+    interrupted at any step.
+
+    Returns:
+        Number of users moved to each shard
+    """
+
+    moved: Dict[str, int] = {}
+    directory = SessionLocal()
+
+    try:
+        users = directory.scalars(select(User).order_by(User.id)).all()
+        _delete_leftovers({user.id: shard_router.shard_of(user) for user in users}, dry_run)   # type: ignore
+
+        for user in users:
+            source = shard_router.shard_of(user)
+            target = shard_router.shard_for(user.id)    # type: ignore
+
+            if source == target:
+                # Users registered before sharding: pin them where they are
+                if user.shard is None and not dry_run:
+                    user.shard = source     # type: ignore
+                    directory.commit()
+                continue
+
+            if shard_router.names.index(target) < shard_router.names.index(source):
+                # Copied IDs would fall in the target's range: shards were
+                # removed or reordered instead of appended
+                raise RuntimeError(
+                    f"User {user.id} would move back from {source} to {target}; "
+                    "only append shards to SHARD_URLS"
+                )
+
+            if not dry_run:
+                _move_user(user.id, source, target)     # type: ignore
+
+                # Flip the directory only once the copy is committed
+                user.shard = target     # type: ignore
+                directory.commit()
+
+                src = shard_router.session(source)
+
+                try:
+                    _delete_user_rows(src, user.id)     # type: ignore
+                    src.commit()
+                finally:
+                    src.close()
+
+            moved[target] = moved.get(target, 0) + 1
+    finally:
+        directory.close()
+
+    return moved
+
+def shard_counts() -> Dict[str, int]:
+    # Number of users whose data lives in each shard
+    counts = {name: 0 for name in shard_router.names}
+    directory = SessionLocal()
+
+    try:
+        for user in directory.scalars(select(User)).all():
+            counts[shard_router.shard_of(user)] += 1
+    finally:
+        directory.close()
+
+    return counts
+
+def _move_user(user_id: int, source: str, target: str) -> None:
+    # Copies every row of a user from one shard to another
+    src = shard_router.session(source)
+    dst = shard_router.session(target)
+
+    try:
+        # Leftovers of an interrupted move are stale: the directory still
+        # points at the source
+        _delete_user_rows(dst, user_id)
+
+        # Rows are copied as they are, IDs included: parents come first, so
+        # references between them stay valid
+        for model in SHARDED_MODELS:
+            table = model.__table__
+            rows = [
+                dict(row)
+                for row in src.execute(
+                    select(table).where(table.c.user_id == user_id)
+                ).mappings()
+            ]
+
+            if rows:
+                dst.execute(insert(table), rows)
+
+        dst.commit()
+    finally:
+        src.close()
+        dst.close()
+
+def _delete_leftovers(owners: Dict[int, str], dry_run: bool) -> None:
+    # Deletes the rows of users found on a shard other than theirs (an
+    # interrupted move). Rows of users missing from the directory, or
+    # pinned to a shard not configured, are kept.
+    for name in shard_router.names:
+        db = shard_router.session(name)
+
+        try:
+            user_ids = set()
+
+            for model in SHARDED_MODELS:
+                table = model.__table__
+                user_ids.update(db.scalars(select(table.c.user_id).distinct()))
+
+            leftovers = sorted(
+                user_id for user_id in user_ids
+                if owners.get(user_id, name) != name and owners[user_id] in shard_router.names
+            )
+
+            for user_id in leftovers:
+                logger.info(
+                    "%s leftover rows of user %d from %s (their data is on %s)",
+                    "Would delete" if dry_run else "Deleting", user_id, name, owners[user_id]
+                )
+
+                if not dry_run:
+                    _delete_user_rows(db, user_id)
+                    db.commit()
+        finally:
+            db.close()
+
+def _reserve_id_range(engine: Engine, name: str, floor: int) -> None:
+    # Makes every sharded table of a shard allocate IDs above `floor`
+    if not floor:
+        return
+
+    with engine.begin() as connection:
+        for model in SHARDED_MODELS:
+            table = model.__table__
+
+            if "id" not in table.c:
+                continue
+
+            if engine.dialect.name == "sqlite":
+                # Only AUTOINCREMENT tables honour sqlite_sequence
+                ddl = connection.scalar(
+                    text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": table.name}
+                )
+
+                if "AUTOINCREMENT" not in ddl.upper():
+                    raise RuntimeError(
+                        f"{name}: table {table.name} was created without AUTOINCREMENT and "
+                        "cannot keep its ID range; only the first shard may be a database "
+                        "created before sharding"
+                    )
+
+                connection.execute(
+                    text("UPDATE sqlite_sequence SET seq = :floor WHERE name = :name AND seq < :floor"),
+                    {"name": table.name, "floor": floor}
+                )
+                connection.execute(
+                    text(
+                        "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :floor "
+                        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+                    ),
+                    {"name": table.name, "floor": floor}
+                )
+            else:
+                sequence = connection.scalar(
+                    text("SELECT pg_get_serial_sequence(:name, 'id')"),
+                    {"name": table.name}
+                )
+
+                if connection.scalar(text(f"SELECT last_value FROM {sequence}")) < floor:
+                    connection.execute(text("SELECT setval(:sequence, :floor)"), {
+                        "sequence": sequence,
+                        "floor": floor
+                    })
+
+def _delete_user_rows(db: Session, user_id: int) -> None:
+    # Children first, so foreign keys never point to deleted rows
+    for model in reversed(SHARDED_MODELS):
+        table = model.__table__
+        db.execute(delete(table).where(table.c.user_id == user_id))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if command == "rebalance":
+        shard_router.create_all()
+        dry_run = "--dry-run" in sys.argv
+        moved = rebalance(dry_run=dry_run)
+
+        for name, count in sorted(moved.items()):
+            print(f"{'Would move' if dry_run else 'Moved'} {count} users to {name}")
+        if not moved:
+            print("All users are on their shard")
+    elif command == "status":
+        for name, count in shard_counts().items():
+            print(f"{name}: {count} users")
+    else:
+        print(__doc__)
+        sys.exit(1)
\ No newline at end of file
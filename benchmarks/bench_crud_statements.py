@@ -0,0 +1,131 @@
+"""
+Per-call cost of the data-access functions: legacy Query chains against
+the cached select() statements used by app/crud.py.
+
+The legacy versions below reproduce the former db.query(...) code, so the
+difference is the Python overhead of building and compiling statements
+(plus the second round-trip of the old two-query summary).
+
+    python -m benchmarks.bench_crud_statements [calls]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timedelta
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import func                 # noqa: E402
+from app import crud                        # noqa: E402
+from app.main import app                    # noqa: E402, F401  Creates the tables
+from app.database import SessionLocal       # noqa: E402
+from app.models import Movement, User       # noqa: E402
+
+def legacy_get_user_by_username(db, username):
+    return db.query(User).filter(User.username == username).first()
+
+def legacy_get_movement(db, movement_id):
+    return db.query(Movement).filter(Movement.id == movement_id).first()
+
+def legacy_get_movements(db, user_id, start_date, end_date, movement_type, skip, limit):
+    query = db.query(Movement).filter(Movement.user_id == user_id)
+
+    if start_date:
+        query = query.filter(Movement.date >= start_date)
+    if end_date:
+        query = query.filter(Movement.date <= end_date)
+    if movement_type:
+        query = query.filter(Movement.type == movement_type.lower())
+
+    return query.offset(skip).limit(limit).all()
+
+def legacy_get_balance_summary(db, user_id, start_date, end_date):
+    base_query = db.query(Movement).filter(Movement.user_id == user_id)
+
+    if start_date:
+        base_query = base_query.filter(Movement.date >= start_date)
+    if end_date:
+        base_query = base_query.filter(Movement.date <= end_date)
+
+    total_income = base_query.filter(Movement.type == "income").with_entities(
+        func.coalesce(func.sum(Movement.amount), 0.0)
+    ).scalar() or 0.0
+    total_expense = base_query.filter(Movement.type == "expense").with_entities(
+        func.coalesce(func.sum(Movement.amount), 0.0)
+    ).scalar() or 0.0
+
+    return total_income, total_expense
+
+def seed(db) -> User:
+    user = User(username="bench", email="bench@example.com", hashed_password="-")
+    db.add(user)
+    db.commit()
+
+    now = datetime.now()
+    db.execute(Movement.__table__.insert(), [
+        {
+            "amount": 10 + i % 50,
+            "type": "expense" if i % 3 else "income",
+            "date": now - timedelta(days=i),
+            "user_id": user.id
+        }
+        for i in range(200)
+    ])
+    db.commit()
+
+    return user
+
+def main() -> None:
+    db = SessionLocal()
+    user = seed(db)
+    user_id: int = user.id  # type: ignore
+    movement_id = db.query(Movement.id).first()[0]  # type: ignore
+    start, end = date.today() - timedelta(days=90), date.today()
+
+    cases = [
+        (
+            "get_user_by_username",
+            lambda: legacy_get_user_by_username(db, "bench"),
+            lambda: crud.get_user_by_username(db, "bench")
+        ),
+        (
+            "get_movement",
+            lambda: legacy_get_movement(db, movement_id),
+            lambda: crud.get_movement(db, movement_id)
+        ),
+        (
+            "get_movements (filtered)",
+            lambda: legacy_get_movements(db, user_id, start, end, "expense", 0, 10),
+            lambda: crud.get_movements(db, user_id, start, end, "expense", 0, 10)
+        ),
+        (
+            "get_balance_summary",
+            lambda: legacy_get_balance_summary(db, user_id, start, end),
+            lambda: crud.get_balance_summary(db, user_id, start, end)
+        ),
+    ]
+
+    print(f"{CALLS} calls each, microseconds per call")
+    print(f"{'function':<28}{'legacy':>10}{'select()':>10}{'saved':>8}")
+
+    for name, legacy, current in cases:
+        # Warm the compiled-statement cache before timing
+        legacy()
+        current()
+
+        legacy_us = timeit.timeit(legacy, number=CALLS) / CALLS * 1e6
+        current_us = timeit.timeit(current, number=CALLS) / CALLS * 1e6
+        saved = 1 - current_us / legacy_us
+
+        print(f"{name:<28}{legacy_us:>10.1f}{current_us:>10.1f}{saved:>8.0%}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Latency of a cold GET /movements/insights computation (cache miss).
+
+Seeds one user with a long history in a throwaway SQLite database and
+times each step of app.insights.get_insights: the all-time summary, the
+recent history fetch, parsing it into arrays and the NumPy computation.
+
+    python -m benchmarks.bench_insights [movements] [days_of_history]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+MOVEMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+HISTORY_DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 3 * 365
+RUNS = 20
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app import crud, insights              # noqa: E402
+from app.main import app                    # noqa: E402, F401  Creates the tables
+from app.database import SessionLocal       # noqa: E402
+from app.models import Movement, User       # noqa: E402
+
+def seed(db) -> int:
+    user = User(username="bench", email="bench@example.com", hashed_password="-")
+    db.add(user)
+    db.commit()
+
+    # Evenly spread over the history, oldest first (insertion order)
+    now = datetime.now()
+    step = timedelta(days=HISTORY_DAYS) / MOVEMENTS
+    random.seed(1)
+
+    db.execute(Movement.__table__.insert(), [
+        {
+            "amount": round(random.uniform(5, 200), 2),
+            "type": "expense" if i % 4 else "income",
+            "date": now - step * (MOVEMENTS - i),
+            "user_id": user.id
+        }
+        for i in range(MOVEMENTS)
+    ])
+    db.commit()
+
+    return user.id     # type: ignore
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1e3
+
+def main() -> None:
+    db = SessionLocal()
+    user_id = seed(db)
+    today = date.today()
+    since = datetime.combine(today - timedelta(days=insights.HISTORY_DAYS), datetime.min.time())
+
+    steps: dict[str, list[float]] = {"summary": [], "fetch": [], "parse": [], "compute": [], "total": []}
+
+    for run in range(RUNS + 1):
+        _, summary_ms = timed(crud.get_balance_summary, db, user_id=user_id)
+        history, fetch_ms = timed(crud.get_movement_history, db, user_id=user_id, since=since)
+        arrays, parse_ms = timed(insights._to_columns, history)
+        _, compute_ms = timed(insights.compute_insights, *arrays, balance=0.0, today=today)
+
+        # Fresh data version on every run: always a cache miss
+        _, total_ms = timed(insights.get_insights, db, user_id=user_id, data_version=-run, today=today)
+
+        if run:     # First run warms the statement cache
+            for name, value in zip(steps, (summary_ms, fetch_ms, parse_ms, compute_ms, total_ms)):
+                steps[name].append(value)
+
+    print(f"{MOVEMENTS:,} movements over {HISTORY_DAYS} days, {len(arrays[0]):,} in the last {insights.HISTORY_DAYS}")
+    print(f"{'step':<10}{'median ms':>10}")
+
+    for name, values in steps.items():
+        print(f"{name:<10}{sorted(values)[len(values) // 2]:>10.1f}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
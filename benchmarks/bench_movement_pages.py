@@ -0,0 +1,97 @@
+"""
+Bandwidth and peak memory of GET /movements/ for large pages.
+
+Compares the buffered list response with the streamed JSON array, with
+and without compression, against a throwaway SQLite database.
+
+    python -m benchmarks.bench_movement_pages [rows]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ["MAX_PAGE_LIMIT"] = str(ROWS)
+
+# The API only serves brotli when the optional brotli-asgi is installed
+ENCODINGS = ("identity", "gzip", "br") if find_spec("brotli_asgi") else ("identity", "gzip")
+
+from fastapi.testclient import TestClient   # noqa: E402
+from app.main import app                    # noqa: E402
+from app.database import SessionLocal       # noqa: E402
+from app.models import Movement, User       # noqa: E402
+from app.auth.dependencies import create_access_token  # noqa: E402
+from app.routers import movement as movement_router    # noqa: E402
+
+stream_threshold = movement_router.STREAM_PAGE_THRESHOLD
+
+def seed() -> str:
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", hashed_password="-")
+    db.add(user)
+    db.commit()
+
+    now = datetime.now()
+    db.execute(Movement.__table__.insert(), [
+        {
+            "amount": 10 + i % 500,
+            "type": "expense" if i % 3 else "income",
+            "description": f"Movement {i}",
+            "date": now - timedelta(minutes=i),
+            "user_id": user.id
+        }
+        for i in range(ROWS)
+    ])
+    db.commit()
+    db.close()
+
+    return create_access_token({"sub": "bench"})
+
+def measure(client: TestClient, token: str, stream: bool, encoding: str) -> tuple[int, int]:
+    # ROWS is above the default threshold, so the page is streamed unless
+    # the threshold is raised past it
+    movement_router.STREAM_PAGE_THRESHOLD = stream_threshold if stream else ROWS
+
+    tracemalloc.start()
+    response = client.get(
+        f"/movements/?limit={ROWS}",
+        headers={"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == ROWS
+    assert response.headers.get("content-encoding", "identity") == encoding
+
+    return response.num_bytes_downloaded, peak
+
+def main() -> None:
+    assert ROWS > stream_threshold, f"Use more than {stream_threshold} rows to reach the streaming mode"
+
+    token = seed()
+    client = TestClient(app)
+
+    print(f"GET /movements/?limit={ROWS}")
+
+    if "br" not in ENCODINGS:
+        print("br skipped: brotli-asgi is not installed (pip install brotli-asgi)")
+
+    print(f"{'mode':<10}{'encoding':<10}{'wire bytes':>14}{'peak memory':>14}")
+
+    for stream in (False, True):
+        for encoding in ENCODINGS:
+            wire, peak = measure(client, token, stream, encoding)
+            mode = "stream" if stream else "list"
+            print(f"{mode:<10}{encoding:<10}{wire:>14,}{peak:>14,}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
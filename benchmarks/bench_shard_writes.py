@@ -0,0 +1,120 @@
+"""
+Write throughput and lock wait of movement creation with 1, 2 and 4 SQLite shards.
+
+Each writer is a separate process (no shared GIL) creating movements for
+its own users through crud.create_movement, one commit per movement with
+synchronous=FULL. Every transaction starts with BEGIN IMMEDIATE, and the
+time spent there is the wait for the shard's write lock. With one file
+every commit takes the same lock; with more shards, users on different
+files commit in parallel.
+
+Throughput only scales when there are spare CPUs: on a single core the
+writers share the same CPU whatever the shard count, and only the lock
+wait goes down.
+
+    python -m benchmarks.bench_shard_writes [writes_per_process] [processes]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+WRITES = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+PROCESSES = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+USERS = PROCESSES * 4
+SHARD_COUNTS = (1, 2, 4)
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/main.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import event                # noqa: E402
+from app import crud                        # noqa: E402
+from app.main import app                    # noqa: E402, F401  Creates the tables
+from app.schemas import MovementCreate      # noqa: E402
+from app.sharding import ShardRouter        # noqa: E402
+
+def open_router(urls: list[str]) -> ShardRouter:
+    router = ShardRouter(urls)
+
+    for name in router.names:
+        @event.listens_for(router._sessions[name].kw["bind"], "connect")
+        def _configure(connection, _):
+            # fsync on every commit; wait for the lock instead of failing
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.execute("PRAGMA busy_timeout=60000")
+
+    return router
+
+def writer(urls: list[str], user_ids: list[int], ready, results) -> None:
+    # Engines are opened in the child: connections must not cross a fork
+    router = open_router(urls)
+    movement = MovementCreate(amount=12.5, type="expense", description="benchmark")   # type: ignore
+    lock_wait = 0.0
+
+    ready.wait()
+
+    for index in range(WRITES):
+        user_id = user_ids[index % len(user_ids)]
+
+        # One session per write, like a request
+        with router.session(router.shard_for(user_id)) as db:
+            start = time.perf_counter()
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            lock_wait += time.perf_counter() - start
+
+            crud.create_movement(db, movement, user_id)
+
+    results.put(lock_wait)
+
+def measure(shards: int) -> tuple[float, float]:
+    run_dir = tempfile.mkdtemp(dir=_tmp_dir)
+    urls = [f"sqlite:///{run_dir}/shard{index}.db" for index in range(shards)]
+    open_router(urls).create_all()
+
+    # Each process owns a disjoint set of users
+    groups = [list(range(1 + process, USERS + 1, PROCESSES)) for process in range(PROCESSES)]
+    ready = multiprocessing.Barrier(PROCESSES + 1)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=writer, args=(urls, group, ready, results))
+        for group in groups
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    # Start the clock once every process has its connections open
+    ready.wait()
+    start = time.perf_counter()
+
+    lock_wait = sum(results.get() for _ in workers)
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0, f"writer failed with exit code {worker.exitcode}"
+
+    # Writes per second, mean lock wait per write (ms)
+    return PROCESSES * WRITES / elapsed, lock_wait / (PROCESSES * WRITES) * 1e3
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    print(f"{PROCESSES} processes x {WRITES} writes, {USERS} users, {cpus} CPUs")
+
+    if cpus < max(SHARD_COUNTS):
+        print("Fewer CPUs than shards: throughput is capped by the CPU, compare the lock wait")
+
+    print(f"{'shards':<8}{'writes/s':>10}{'speedup':>9}{'lock wait/write':>17}")
+
+    baseline = None
+
+    for shards in SHARD_COUNTS:
+        throughput, lock_wait_ms = measure(shards)
+        baseline = baseline or throughput
+        print(f"{shards:<8}{throughput:>10.0f}{throughput / baseline:>8.2f}x{lock_wait_ms:>14.2f} ms")
+
+if __name__ == "__main__":
+    main()
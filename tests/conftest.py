@@ -0,0 +1,40 @@
+import os
+import tempfile
+from uuid import uuid4
+
+# The app reads its configuration at import time: point it at a throwaway
+# database before anything imports it
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+os.environ["SECRET_KEY"] = "test-secret-key"
+os.environ["RECURRING_SCHEDULER"] = "0"
+
+import pytest                               # noqa: E402
+from fastapi.testclient import TestClient   # noqa: E402
+from app.main import app                    # noqa: E402
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+def register(client: TestClient) -> tuple[str, dict[str, str]]:
+    # Registers a fresh user and returns its username and auth headers
+    username = f"user-{uuid4().hex[:12]}"
+    password = "TestPassword1!"
+
+    response = client.post("/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password
+    })
+    assert response.status_code == 201, response.text
+
+    response = client.post("/login", data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+
+    return username, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def auth_headers(client: TestClient) -> dict[str, str]:
+    # A fresh user per test, so tests never see each other's data
+    return register(client)[1]
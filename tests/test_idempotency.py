@@ -0,0 +1,125 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app import idempotency
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import IdempotencyKey
+from app.schemas import MovementCreate
+
+MOVEMENT = {"amount": 42.5, "type": "expense", "description": "groceries"}
+
+def _movements(client: TestClient, headers: dict[str, str]) -> list:
+    return client.get("/movements/", headers=headers).json()
+
+def _post(client: TestClient, headers: dict[str, str], key: str, body: dict=MOVEMENT):
+    return client.post("/movements/", json=body, headers={**headers, "Idempotency-Key": key})
+
+def test_retry_replays_the_first_response(client, auth_headers):
+    first = _post(client, auth_headers, "retry")
+    second = _post(client, auth_headers, "retry")
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert len(_movements(client, auth_headers)) == 1
+
+def test_reused_key_with_another_body_is_rejected(client, auth_headers):
+    _post(client, auth_headers, "reused")
+    response = _post(client, auth_headers, "reused", {**MOVEMENT, "amount": 1})
+
+    assert response.status_code == 422
+    assert len(_movements(client, auth_headers)) == 1
+
+def test_concurrent_requests_with_one_key_create_one_movement(client, auth_headers):
+    requests = 6
+    barrier = Barrier(requests)
+
+    def send(_):
+        barrier.wait()
+        return _post(client, auth_headers, "concurrent")
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        responses = list(pool.map(send, range(requests)))
+
+    assert [response.status_code for response in responses] == [201] * requests
+    assert sum("Idempotent-Replayed" not in response.headers for response in responses) == 1
+    assert len({response.text for response in responses}) == 1
+    assert len(_movements(client, auth_headers)) == 1
+
+def test_losing_a_race_replays_the_winner(client, auth_headers, monkeypatch):
+    winner = {**MOVEMENT, "id": 999_999, "date": "2025-01-01T00:00:00", "user_id": 0}
+    lookup = idempotency.store.lookup
+    lookups = []
+
+    def lookup_then_lose(db, user_id, key):
+        stored = lookup(db, user_id, key)
+        lookups.append(stored)
+
+        if len(lookups) == 1:
+            # Another request commits the same key once this one missed it
+            other = SessionLocal()
+            other.add(IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                request_hash=idempotency.request_fingerprint(MovementCreate(**MOVEMENT).model_dump(mode="json")),
+                status_code=201,
+                response_body=json.dumps(winner)
+            ))
+            other.commit()
+            other.close()
+
+        return stored
+
+    monkeypatch.setattr(idempotency.store, "lookup", lookup_then_lose)
+    response = _post(client, auth_headers, "race")
+
+    assert lookups[0] is None and lookups[1] is not None
+    assert response.status_code == 201
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json() == winner
+    assert _movements(client, auth_headers) == []
+
+def test_replay_missing_the_cache_only_reads(client, auth_headers, monkeypatch):
+    _post(client, auth_headers, "cold")
+
+    # Another worker: the response is only in the database
+    monkeypatch.setattr(idempotency.store, "_cache", type(idempotency.store._cache)())
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+
+    try:
+        response = _post(client, auth_headers, "cold")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert statements and set(statements) == {"SELECT"}
+
+def test_key_stays_free_after_a_failure(client, auth_headers, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("storage failure")
+
+    monkeypatch.setattr(idempotency.store, "save", fail)
+    failed = TestClient(app, raise_server_exceptions=False).post(
+        "/movements/",
+        json=MOVEMENT,
+        headers={**auth_headers, "Idempotency-Key": "failure"}
+    )
+    monkeypatch.undo()
+
+    assert failed.status_code == 500
+    assert _movements(client, auth_headers) == []
+
+    retry = _post(client, auth_headers, "failure")
+
+    assert retry.status_code == 201
+    assert "Idempotent-Replayed" not in retry.headers
+    assert len(_movements(client, auth_headers)) == 1
@@ -0,0 +1,139 @@
+from datetime import timedelta
+import pytest
+from app import scheduler, sharding
+from app.database import SessionLocal, SQLALCHEMY_DATABASE_URL
+from app.models import Movement, RecurringMovement, User
+from app.recurring import utc_today
+from app.sharding import ShardRouter, SHARD_ID_RANGE
+from tests.conftest import register
+
+# Modules holding a reference to the router
+ROUTER_MODULES = ("app.sharding", "app.auth.crud", "app.auth.dependencies", "app.routers.movement", "app.scheduler")
+
+@pytest.fixture
+def add_shard(monkeypatch, tmp_path):
+    # Appends a second shard to the main database, as SHARD_URLS would
+    def add() -> ShardRouter:
+        router = ShardRouter([SQLALCHEMY_DATABASE_URL, f"sqlite:///{tmp_path}/shard1.db"])
+        router.create_all()
+
+        for module in ROUTER_MODULES:
+            monkeypatch.setattr(f"{module}.shard_router", router)
+
+        return router
+
+    return add
+
+def _seed(client, headers: dict[str, str]) -> None:
+    today = utc_today()
+
+    for index in range(3):
+        response = client.post("/movements/", json={
+            "amount": 10 + index,
+            "type": "expense",
+            "description": f"movement {index}"
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+
+    response = client.post("/recurring/", json={
+        "amount": 5,
+        "type": "expense",
+        "frequency": "weekly",
+        "start_date": str(today - timedelta(weeks=3))
+    }, headers=headers)
+    assert response.status_code == 201, response.text
+
+    response = client.post("/budgets/", json={
+        "period": today.strftime("%Y-%m"),
+        "limit_amount": 1
+    }, headers=headers)
+    assert response.status_code == 201, response.text
+
+def _snapshot(client, headers: dict[str, str]) -> dict[str, list]:
+    return {
+        path: sorted(client.get(path, headers=headers).json(), key=lambda record: record["id"])
+        for path in ("/movements/", "/recurring/", "/budgets/")
+    }
+
+def _shard_of(username: str) -> str:
+    directory = SessionLocal()
+
+    try:
+        return directory.query(User).filter(User.username == username).one().shard   # type: ignore
+    finally:
+        directory.close()
+
+def test_rebalance_keeps_record_ids(client, add_shard):
+    users = [register(client) for _ in range(8)]
+
+    for _, headers in users:
+        _seed(client, headers)
+
+    before = {username: _snapshot(client, headers) for username, headers in users}
+
+    add_shard()
+    moved = sharding.rebalance()
+
+    assert moved.get("shard1")
+
+    for username, headers in users:
+        assert _snapshot(client, headers) == before[username]
+
+        for movement in before[username]["/movements/"]:
+            response = client.get(f"/movements/{movement['id']}", headers=headers)
+            assert response.json() == movement
+
+        # New records get IDs from their shard's own range
+        shard_index = int(_shard_of(username).removeprefix("shard"))
+        response = client.post("/movements/", json={"amount": 1, "type": "income"}, headers=headers)
+        assert response.json()["id"] // SHARD_ID_RANGE == shard_index
+
+def test_rebalance_finishes_an_interrupted_move(client, add_shard, monkeypatch):
+    users = [register(client) for _ in range(8)]
+
+    for _, headers in users:
+        _seed(client, headers)
+
+    router = add_shard()
+    delete_user_rows = sharding._delete_user_rows
+    calls = []
+
+    def crash_after_flip(db, user_id):
+        # 1st call: target cleanup in _move_user; 2nd: source delete, which
+        # runs after users.shard was flipped
+        calls.append(user_id)
+
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+
+        delete_user_rows(db, user_id)
+
+    monkeypatch.setattr(sharding, "_delete_user_rows", crash_after_flip)
+
+    with pytest.raises(RuntimeError, match="killed"):
+        sharding.rebalance()
+
+    monkeypatch.setattr(sharding, "_delete_user_rows", delete_user_rows)
+    user_id = calls[0]
+
+    source = router.session("shard0")
+    target = router.session("shard1")
+
+    try:
+        # The directory already points at shard1 and both copies exist
+        assert source.query(Movement).filter(Movement.user_id == user_id).count()
+        assert target.query(Movement).filter(Movement.user_id == user_id).count()
+
+        sharding.rebalance()
+
+        # The re-run deleted the copy left on the old shard...
+        assert source.query(Movement).filter(Movement.user_id == user_id).count() == 0
+        assert source.query(RecurringMovement).filter(RecurringMovement.user_id == user_id).count() == 0
+
+        # ...so its recurring templates no longer create movements there
+        assert scheduler.run_once(utc_today() + timedelta(weeks=2)) > 0
+        assert source.query(Movement).filter(Movement.user_id == user_id).count() == 0
+        assert target.query(Movement).filter(Movement.user_id == user_id).count()
+    finally:
+        source.close()
+        target.close()